@@ -1,9 +1,12 @@
+import os
+
 from electoral_system_analysis.clean_electoral_data import (
     clean_2019,
     create_region_table_2019,
     read_data_2023,
     read_data_2023_rtve,
 )
+from electoral_system_analysis.pipeline import PipelineStep, run_pipeline
 
 # Es necesario descargar este archivo de:
 # https://resultados.generales23j.es/assets/files/congreso.pdf
@@ -13,12 +16,41 @@ PATH_2023_RTVE = "electoral_data/raw_data/2023_julio/Datos definitivos Eleccione
 
 PATH_TO_WRITE_2019 = "electoral_data/clean_data/2019_noviembre"
 PATH_TO_WRITE_2023 = "electoral_data/clean_data/2023_julio"
+PATH_MANIFEST = "electoral_data/clean_data/manifest.json"
 
-if __name__ == "__main__":
-    reg_2019, df_parties_2019 = clean_2019(PATH_2019, PATH_TO_WRITE_2019)
-    df_regions_2019 = create_region_table_2019(PATH_2019, PATH_TO_WRITE_2019)
-    df_pre_parties_2023 = read_data_2023(PATH_2023, PATH_TO_WRITE_2023)
-    print(df_pre_parties_2023)
+STEPS = [
+    PipelineStep(
+        "clean_2019",
+        clean_2019,
+        (PATH_2019,),
+        (
+            os.path.join(PATH_TO_WRITE_2019, "regions_raw_data.csv"),
+            os.path.join(PATH_TO_WRITE_2019, "clean_data_votes.csv"),
+        ),
+        {"file_2019": PATH_2019, "path_to_write": PATH_TO_WRITE_2019},
+    ),
+    PipelineStep(
+        "create_region_table_2019",
+        create_region_table_2019,
+        (PATH_2019,),
+        (os.path.join(PATH_TO_WRITE_2019, "region_table_2019.csv"),),
+        {"file_2019": PATH_2019, "path_to_write": PATH_TO_WRITE_2019},
+    ),
+    PipelineStep(
+        "read_data_2023",
+        read_data_2023,
+        (PATH_2023,),
+        (os.path.join(PATH_TO_WRITE_2023, "pre_clean_congreso.csv"),),
+        {"path": PATH_2023, "path_to_write": PATH_TO_WRITE_2023},
+    ),
+    PipelineStep(
+        "read_data_2023_rtve",
+        read_data_2023_rtve,
+        (PATH_2023_RTVE,),
+        (os.path.join(PATH_TO_WRITE_2023, "rtve_congreso.csv"),),
+        {"path": PATH_2023_RTVE, "path_to_write": PATH_TO_WRITE_2023},
+    ),
+]
 
-    data = read_data_2023_rtve(PATH_2023_RTVE)
-    print(data)
+if __name__ == "__main__":
+    run_pipeline(STEPS, PATH_MANIFEST)
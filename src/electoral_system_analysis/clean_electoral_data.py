@@ -1,6 +1,6 @@
 import os
 import re
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import pandas as pd
 from pypdf import PdfReader
@@ -29,6 +29,37 @@ def format_serie_values(values: pd.Series) -> pd.Series:
     return values
 
 
+def read_ine_electors(path: str, elector_type: str = "Total") -> pd.DataFrame:
+    """
+    Función que lee las tablas de electores por provincia del INE, por ejemplo
+    raw_data/2023_julio/59755.csv. Son archivos separados por ";" y con el punto como
+    separador de miles. Si la tabla tiene la columna Periodo se conserva como year.
+
+    Parameters
+    ----------
+    path: str
+        Ruta del archivo csv descargado del INE.
+    elector_type: str, default "Total"
+        Tipo de elector a leer.
+
+    Returns
+    -------
+    df_census: pd.DataFrame
+        Tabla con las columnas name, codename, size y year si aparece en el archivo.
+    """
+    df_census = pd.read_csv(path, sep=";", thousands=".", encoding="utf-8-sig")
+    df_census = df_census[
+        (df_census["Tipo de elector"] == elector_type) & (df_census.Provincias != "TOTAL")
+    ]
+    df_census = df_census.rename(columns={"Provincias": "name", "Total": "size"})
+    df_census["codename"] = format_serie_values(df_census.name)
+    columns = ["name", "codename", "size"]
+    if "Periodo" in df_census.columns:
+        df_census["year"] = df_census.Periodo.astype(str).str[:4].astype(int)
+        columns = ["year"] + columns
+    return df_census[columns].reset_index(drop=True)
+
+
 def create_region_table_2019(file_2019: str, path_to_write: str) -> pd.DataFrame:
     """
     Función que crea la tabla de regiones sacada de la información de 2019.
@@ -228,7 +259,7 @@ def format_pdf_data_2023(text: List[str]) -> pd.DataFrame:
     return result
 
 
-def read_data_2023_rtve(path: str) -> pd.DataFrame:
+def read_data_2023_rtve(path: str, path_to_write: Optional[str] = None) -> pd.DataFrame:
     """
     Función que lee los datos de elecciones de 2023 sacados de la página de rtve.
 
@@ -236,6 +267,8 @@ def read_data_2023_rtve(path: str) -> pd.DataFrame:
     ----------
     path: str
         Ruta del archivo excel con la información dividida por regiones en cada hoja
+    path_to_write: Optional[str], default None
+        Ruta donde se quiere guardar los resultados. Si es None no se guardan.
 
     Returns
     -------
@@ -251,4 +284,7 @@ def read_data_2023_rtve(path: str) -> pd.DataFrame:
         df = book.parse(c_name)
         df.insert(0, "Circunscription", c_name)
         result = pd.concat((result, df))
-    return result.fillna(0)
+    result = result.fillna(0)
+    if path_to_write is not None:
+        result.to_csv(os.path.join(path_to_write, "rtve_congreso.csv"))
+    return result
@@ -1,9 +1,16 @@
-from typing import Callable
+from typing import Callable, Dict, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+from electoral_system_analysis.stv import stv_rule
+
 FormulaFunction = Callable[[pd.DataFrame, int], pd.DataFrame]
+DivisorFunction = Callable[[np.ndarray], np.ndarray]
+QuotaFunction = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+# Número máximo de cocientes que se generan a la vez en las fórmulas matriciales.
+MAX_CHUNK_ELEMENTS = 2**24
 
 
 class FormulaDosntExist(Exception):
@@ -232,7 +239,8 @@ def get_distribution_formula(formula_name: str) -> FormulaFunction:
     Parameters
     ----------
     formula_name: str
-        Nombre del método: dhondt, sainte_lague, sainte_lague_modificado, hare
+        Nombre del método: dhondt, sainte_lague, sainte_lague_modificado, hare, imperiali,
+        droop, hagenbach, stv
 
     Returns
     -------
@@ -249,6 +257,7 @@ def get_distribution_formula(formula_name: str) -> FormulaFunction:
         "imperiali": imperiali_coefficient,
         "droop": droop_coefficient,
         "hagenbach": hagenbach_coefficient,
+        "stv": stv_rule,
     }
 
     try:
@@ -298,6 +307,196 @@ def distributions_representative_by_regions(
     return df_rep
 
 
+DIVISOR_FORMULAS: Dict[str, DivisorFunction] = {
+    "dhondt": lambda k: k + 1.0,
+    "sainte_lague": lambda k: 2.0 * k + 1,
+    "sainte_lague_modificado": lambda k: np.where(k == 0, 1.4, 2.0 * k + 1),
+}
+
+QUOTA_FORMULAS: Dict[str, QuotaFunction] = {
+    "hare": lambda total, rep: total // rep,
+    "droop": lambda total, rep: 1 + total // (rep + 1),
+    "hagenbach": lambda total, rep: total // (rep + 1),
+    "imperiali": lambda total, rep: total // (rep + 2),
+}
+# Con votos de partido el voto único transferible reparte igual que el cociente de Droop.
+QUOTA_FORMULAS["stv"] = QUOTA_FORMULAS["droop"]
+
+
+def votes_to_matrix(votes: pd.DataFrame, regions: pd.DataFrame) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Función que convierte la tabla de votos en una matriz regiones x partidos en el orden
+    de la columna reg_el_id de regions y con los partidos ordenados.
+
+    Parameters
+    ----------
+    votes: pd.DataFrame
+        Tabla con los votos por partido y regiones.
+    regions: pd.DataFrame
+        Tabla con el reparto de escaños por regiones.
+
+    Returns
+    -------
+    votes_matrix: np.ndarray
+        Matriz regiones x partidos con los votos.
+    parties: pd.Index
+        Partidos asociados a las columnas de la matriz.
+    """
+    votes_matrix = votes.pivot_table(
+        index="region", columns="party", values="votes", aggfunc="sum", fill_value=0
+    )
+    votes_matrix = votes_matrix.reindex(regions.reg_el_id.values, fill_value=0)
+    return votes_matrix.values, votes_matrix.columns
+
+
+def distributions_representative_matrix(
+    formula_name: str,
+    votes: np.ndarray,
+    n_rep: np.ndarray,
+    electoral_barrier: float = 0.0,
+    eligible: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Función que aplica la fórmula de reparto a la vez sobre todas las filas de una matriz
+    de votos, por ejemplo regiones x partidos o escenarios x regiones x partidos. Da el
+    mismo reparto que las fórmulas de get_distribution_formula; los empates se deshacen a
+    favor del partido con menor índice.
+
+    Parameters
+    ----------
+    formula_name: str
+        Nombre de la fórmula de cálculo del reparto.
+    votes: np.ndarray
+        Matriz (..., partidos) con los votos.
+    n_rep: np.ndarray
+        Matriz (...) con los escaños a repartir en cada fila.
+    electoral_barrier: float, default 0.0
+        Valor de la barrera electoral sobre los votos de cada fila.
+    eligible: Optional[np.ndarray], default None
+        Matriz (..., partidos) de booleanos con los partidos que pueden recibir escaños
+        además de la barrera electoral.
+
+    Returns
+    -------
+    rep: np.ndarray
+        Matriz (..., partidos) con los escaños de cada partido.
+    """
+    if formula_name not in DIVISOR_FORMULAS and formula_name not in QUOTA_FORMULAS:
+        raise FormulaDosntExist(
+            f"El método {formula_name} no existe. "
+            f"Prueba con {list(DIVISOR_FORMULAS) + list(QUOTA_FORMULAS)}."
+        )
+    votes = np.asarray(votes, dtype=float)
+    shape = votes.shape
+    votes = votes.reshape(-1, shape[-1])
+    n_rep = np.broadcast_to(np.asarray(n_rep, dtype=int), shape[:-1]).reshape(-1)
+    mask = votes >= electoral_barrier * votes.sum(1, keepdims=True)
+    if eligible is not None:
+        mask &= np.broadcast_to(eligible, shape).reshape(votes.shape)
+    if ((~mask).all(1) & (n_rep > 0)).any():
+        raise RuntimeError(
+            f"No hay votos para ningún partido en esta región que hayan "
+            f"superado la barrera electoral de {electoral_barrier*100} %."
+        )
+
+    rep = np.zeros(votes.shape, dtype=int)
+    max_rep = max(int(n_rep.max(initial=0)), 1)
+    chunk_rows = max(MAX_CHUNK_ELEMENTS // (votes.shape[1] * max_rep), 1)
+    for start in range(0, votes.shape[0], chunk_rows):
+        rows = slice(start, start + chunk_rows)
+        if formula_name in DIVISOR_FORMULAS:
+            rep[rows] = _divisor_matrix(
+                DIVISOR_FORMULAS[formula_name], votes[rows], n_rep[rows], mask[rows]
+            )
+        else:
+            rep[rows] = _quota_matrix(
+                QUOTA_FORMULAS[formula_name], votes[rows], n_rep[rows], mask[rows]
+            )
+    return rep.reshape(shape)
+
+
+def _divisor_matrix(
+    divisor: DivisorFunction, votes: np.ndarray, n_rep: np.ndarray, mask: np.ndarray
+) -> np.ndarray:
+    """
+    Función que reparte los escaños de cada fila con un método de divisores. Las filas se
+    agrupan por escaños a repartir, se generan los cocientes de cada partido y se eligen
+    los n_rep mayores de cada fila. Como en las fórmulas por tabla, los cocientes de
+    divisores enteros se redondean hacia abajo.
+
+    Parameters
+    ----------
+    divisor: DivisorFunction
+        Función que devuelve el divisor del escaño k (empezando en 0).
+    votes: np.ndarray
+        Matriz filas x partidos con los votos.
+    n_rep: np.ndarray
+        Escaños a repartir en cada fila.
+    mask: np.ndarray
+        Matriz filas x partidos con los partidos que pueden recibir escaños.
+
+    Returns
+    -------
+    rep: np.ndarray
+        Matriz filas x partidos con los escaños de cada partido.
+    """
+    rep = np.zeros(votes.shape, dtype=int)
+    for total_rep in np.unique(n_rep[n_rep > 0]):
+        rows = n_rep == total_rep
+        divisors = divisor(np.arange(total_rep))
+        quotients = votes[rows][:, :, None] / divisors
+        integer = divisors == np.floor(divisors)
+        quotients[:, :, integer] = np.floor(quotients[:, :, integer])
+        quotients[~mask[rows]] = -np.inf
+        quotients = quotients.reshape(quotients.shape[0], -1)
+        # Cociente del último escaño repartido en cada fila y desempate por orden.
+        threshold = -np.partition(-quotients, total_rep - 1, axis=1)[:, [total_rep - 1]]
+        above = quotients > threshold
+        tied = quotients == threshold
+        rest_n_rep = total_rep - above.sum(1, keepdims=True)
+        selected = above | (tied & (np.cumsum(tied, axis=1) <= rest_n_rep))
+        rep[rows] = selected.reshape(-1, votes.shape[1], total_rep).sum(2)
+    return rep
+
+
+def _quota_matrix(
+    quota: QuotaFunction, votes: np.ndarray, n_rep: np.ndarray, mask: np.ndarray
+) -> np.ndarray:
+    """
+    Función que reparte los escaños de cada fila con un método de cociente y restos
+    mayores.
+
+    Parameters
+    ----------
+    quota: QuotaFunction
+        Función que devuelve el cociente a partir de los votos totales y los escaños.
+    votes: np.ndarray
+        Matriz filas x partidos con los votos.
+    n_rep: np.ndarray
+        Escaños a repartir en cada fila.
+    mask: np.ndarray
+        Matriz filas x partidos con los partidos que pueden recibir escaños.
+
+    Returns
+    -------
+    rep: np.ndarray
+        Matriz filas x partidos con los escaños de cada partido.
+    """
+    votes = np.where(mask, votes, 0)
+    coeff = np.maximum(quota(votes.sum(1), np.maximum(n_rep, 1)), 1)[:, None]
+    rep = (votes // coeff).astype(int)
+    rest_votes = np.where(mask, votes - rep * coeff, -np.inf)
+    rest_n_rep = n_rep - rep.sum(1)
+    order = np.argsort(-rest_votes, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(votes.shape[1])[None, :], axis=1)
+    # Si sobran más escaños que partidos con escaño posible se dan por turnos entre ellos.
+    n_eligible = np.maximum(mask.sum(1, keepdims=True), 1)
+    extra = -((ranks - rest_n_rep[:, None]) // n_eligible)
+    rep += np.where(mask, np.maximum(extra, 0), 0)
+    return np.where(n_rep[:, None] > 0, rep, 0)
+
+
 def score_proportionality(representative: pd.Series, votes: pd.Series) -> float:
     """
     Función que calcula un score de representatividad como 1 menos la media de la diferencia
@@ -1,6 +1,10 @@
+from typing import Optional
+
 import numpy as np
 import pandas as pd
 
+from electoral_system_analysis.distribution_formulas import distributions_representative_matrix
+
 
 def get_representative_by_regions(
     df_regions: pd.DataFrame, n_representative: int, min_representative: int, method: str = "loreg"
@@ -28,6 +32,7 @@ def get_representative_by_regions(
     df_regions: pd.DataFrame
         DataFrame con el reparto de diputados por regiones
     """
+    df_regions = df_regions.copy()
     df_regions.insert(1, "n_rep", 1)
 
     method_formula = {
@@ -153,8 +158,92 @@ def _distribution_hare(
     regions_s["n_rep"] += regions_s["size"] // coeff_hare
     regions_s["size_s"] = regions_s["size"] - (regions_s.n_rep - min_representative) * coeff_hare
     regions_s = regions_s.sort_values("size_s", ascending=False).reset_index(drop=True)
-    rest_n_rep = rep_to_share - regions_s.n_rep.sum()
+    rest_n_rep = rep_to_share - (regions_s.n_rep - min_representative).sum()
     for i in range(rest_n_rep):
         regions_s.loc[i, "n_rep"] += 1
-    regions[mask_prov] = regions_s.sort_values("reg_el_id")
+    regions.loc[mask_prov, "n_rep"] = regions_s.sort_values("reg_el_id").n_rep.values
     return regions
+
+
+def get_representative_by_regions_series(
+    df_census: pd.DataFrame,
+    n_representative: int,
+    min_representative: int,
+    method: str = "loreg",
+    type_reg: Optional[pd.Series] = None,
+) -> pd.DataFrame:
+    """
+    Función que reparte los escaños por regiones para cada año de una serie censal a la
+    vez. Da el mismo reparto que get_representative_by_regions aplicada a cada año.
+
+    Parameters
+    ----------
+    df_census: pd.DataFrame
+        Tabla años x regiones con la población con derecho a voto.
+    n_representative: int
+        Número total de representantes
+    min_representative: int
+        Mínimo de representantes por provincias
+    method: str
+        Nombre del método de reparto. Por defecto utiliza el explicado en la LOREG
+    type_reg: Optional[pd.Series], default None
+        Serie indexada por región con "prov" o "caut". Por defecto son "caut" las columnas
+        ceuta y melilla.
+
+    Returns
+    -------
+    df_seats: pd.DataFrame
+        Tabla años x regiones con el reparto de diputados.
+    """
+    if type_reg is None:
+        type_reg = pd.Series("prov", index=df_census.columns)
+        type_reg[df_census.columns.isin(["ceuta", "melilla"])] = "caut"
+    mask_prov = (type_reg.reindex(df_census.columns) == "prov").values
+    sizes = df_census.values.astype(float)
+    n_rep = np.where(mask_prov, min_representative, 1) * np.ones(sizes.shape, dtype=int)
+    rep_to_share = n_representative - n_rep.sum(1)
+
+    if method == "loreg":
+        ratio = sizes[:, mask_prov].sum(1, keepdims=True) // rep_to_share[:, None]
+        quotient = np.where(mask_prov, sizes / ratio, 0)
+        n_rep += quotient.astype(int)
+        rest = quotient - quotient.astype(int)
+        order = np.argsort(-rest, axis=1, kind="stable")
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(sizes.shape[1])[None, :], axis=1)
+        n_rep += ranks < (n_representative - n_rep.sum(1))[:, None]
+    elif method in ["dhondt", "hare"]:
+        n_rep += distributions_representative_matrix(
+            method, sizes, rep_to_share, eligible=mask_prov
+        )
+    else:
+        raise RuntimeError(
+            f"No existe el método {method}. " f"Elige el método {['loreg', 'dhondt', 'hare']}."
+        )
+    return pd.DataFrame(n_rep, index=df_census.index, columns=df_census.columns)
+
+
+def get_seat_changes(df_seats: pd.DataFrame) -> pd.DataFrame:
+    """
+    Función que señala los años en los que una región gana o pierde escaños respecto al
+    año anterior.
+
+    Parameters
+    ----------
+    df_seats: pd.DataFrame
+        Tabla años x regiones con el reparto de diputados.
+
+    Returns
+    -------
+    df_changes: pd.DataFrame
+        Tabla con las columnas year, region, n_rep y change de cada cambio.
+    """
+    df_seats = df_seats.sort_index()
+    change = df_seats.diff().iloc[1:]
+    df_changes = change.stack().rename("change").reset_index()
+    df_changes.columns = ["year", "region", "change"]
+    df_changes = df_changes[df_changes.change != 0]
+    n_rep = df_seats.stack().rename("n_rep")
+    df_changes.insert(2, "n_rep", n_rep.loc[list(zip(df_changes.year, df_changes.region))].values)
+    df_changes["change"] = df_changes.change.astype(int)
+    return df_changes.reset_index(drop=True)
@@ -0,0 +1,300 @@
+import hashlib
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+from electoral_system_analysis.distribution_formulas import distributions_representative_matrix
+
+# La LOREG reparte con cociente y restos mayores, que coincide con el cociente de Hare.
+APPORTIONMENT_METHODS = {"loreg": "hare"}
+
+
+class HierarchicalResult(NamedTuple):
+    """
+    Resultado del reparto jerárquico.
+
+    df_nodes: pd.DataFrame
+        Tabla con las columnas node, parent, depth y n_rep de cada nodo del árbol.
+    votes_rep: pd.DataFrame
+        Tabla con las columnas region, party, votes y n_rep de cada hoja del árbol.
+    df_rep: pd.DataFrame
+        Tabla con el reparto total de escaños por partido.
+    n_computed: int
+        Número de nodos que se han calculado sin usar la caché.
+    """
+
+    df_nodes: pd.DataFrame
+    votes_rep: pd.DataFrame
+    df_rep: pd.DataFrame
+    n_computed: int
+
+
+class HierarchicalApportionment:
+    """
+    Clase que reparte los escaños en un árbol de regiones, por ejemplo nación, comunidades
+    y provincias. Cada nodo reparte sus escaños entre sus hijos según su tamaño y las
+    hojas reparten sus escaños entre partidos. Los nodos de un mismo nivel se reparten en
+    una sola llamada y las hojas de todo el árbol en otra. Se guardan los resultados de
+    cada subárbol, de manera que en llamadas posteriores sólo se calculan los subárboles
+    cuyos escaños, votos o reglas han cambiado.
+
+    Parameters
+    ----------
+    formula_name: str
+        Nombre de la fórmula de cálculo del reparto entre partidos en las hojas.
+    method: str, default "loreg"
+        Fórmula de reparto de escaños entre los hijos de cada nodo: loreg o cualquier
+        fórmula de distributions_representative_matrix.
+    cache_size: int, default 100000
+        Número máximo de subárboles guardados.
+    """
+
+    def __init__(self, formula_name: str, method: str = "loreg", cache_size: int = 100000):
+        self.formula_name = formula_name
+        self.method = APPORTIONMENT_METHODS.get(method, method)
+        self.cache_size = cache_size
+        self._cache: Dict[Tuple[bytes, int, bytes], Tuple[Dict[str, int], np.ndarray]] = {}
+
+    def run(
+        self, tree: pd.DataFrame, votes: pd.DataFrame, n_representative: int
+    ) -> HierarchicalResult:
+        """
+        Método que reparte los escaños del árbol de arriba a abajo.
+
+        Parameters
+        ----------
+        tree: pd.DataFrame
+            Tabla con las columnas node y parent (nulo en la raíz) y las columnas
+            opcionales:
+                - size: Población de las hojas. En los nodos internos es la suma de sus
+                hojas si no se indica.
+                - min_rep: Mínimo de escaños del nodo. Por defecto 0.
+                - type_reg: "caut" si el nodo recibe sólo su mínimo. Por defecto "prov".
+                - electoral_barrier: Barrera sobre los votos del nodo que deben superar
+                los partidos en todas sus hojas. Por defecto 0.
+        votes: pd.DataFrame
+            Tabla con los votos por partido y hojas (columna region).
+        n_representative: int
+            Número total de representantes
+
+        Returns
+        -------
+        result: HierarchicalResult
+            Resultado del reparto.
+        """
+        tree = _prepare_tree(tree)
+        nodes = tree.node.tolist()
+        position = {node: i for i, node in enumerate(nodes)}
+        children = tree.groupby("parent", sort=False).node.apply(list).to_dict()
+        is_leaf = ~tree.node.isin(children.keys()).values
+        leaves = tree.node[is_leaf].tolist()
+        leaf_position = {leaf: i for i, leaf in enumerate(leaves)}
+
+        leaf_votes = votes.pivot_table(
+            index="region", columns="party", values="votes", aggfunc="sum", fill_value=0
+        )
+        parties = leaf_votes.columns
+        leaf_votes = leaf_votes.reindex(leaves, fill_value=0).values.astype(float)
+
+        # Matriz nodos x hojas con las hojas de cada subárbol.
+        subtree = np.zeros((len(nodes), len(leaves)), dtype=bool)
+        subtree[np.flatnonzero(is_leaf), np.arange(len(leaves))] = True
+        for node in reversed(nodes):
+            if node in children:
+                subtree[position[node]] = subtree[[position[c] for c in children[node]]].any(0)
+        node_votes = subtree @ leaf_votes
+        sizes = np.where(
+            tree["size"].isna().values, subtree @ tree["size"].values[is_leaf], tree["size"]
+        )
+        barrier = tree.electoral_barrier.values[:, None]
+        node_ok = node_votes >= barrier * node_votes.sum(1, keepdims=True)
+
+        # Partidos permitidos por los antecesores de cada nodo.
+        inherited = np.ones(node_votes.shape, dtype=bool)
+        for node in nodes:
+            for child in children.get(node, []):
+                inherited[position[child]] = inherited[position[node]] & node_ok[position[node]]
+
+        signatures = _get_signatures(tree, children, leaf_votes, leaf_position)
+        n_rep = np.zeros(len(nodes), dtype=int)
+        leaf_rep = np.zeros(leaf_votes.shape, dtype=int)
+        computed: List[int] = []
+        frontier = [position[tree.node[tree.parent.isna()].iloc[0]]]
+        n_rep[frontier[0]] = n_representative
+        pending_leaves = []
+
+        while frontier:
+            to_split = []
+            for i in frontier:
+                key = (signatures[i], int(n_rep[i]), np.packbits(inherited[i]).tobytes())
+                if key in self._cache:
+                    cached_nodes, cached_leaves = self._cache[key]
+                    for node, value in cached_nodes.items():
+                        n_rep[position[node]] = value
+                    leaf_rep[subtree[i]] = cached_leaves
+                    continue
+                computed.append(i)
+                if is_leaf[i]:
+                    pending_leaves.append(i)
+                else:
+                    to_split.append(i)
+            frontier = self._split_level(to_split, children, position, tree, sizes, n_rep)
+
+        if pending_leaves:
+            rows = [leaf_position[nodes[i]] for i in pending_leaves]
+            leaf_rep[rows] = distributions_representative_matrix(
+                self.formula_name,
+                leaf_votes[rows],
+                n_rep[pending_leaves],
+                eligible=(inherited & node_ok)[pending_leaves],
+            )
+
+        if len(self._cache) + len(computed) > self.cache_size:
+            self._cache.clear()
+        for i in computed:
+            key = (signatures[i], int(n_rep[i]), np.packbits(inherited[i]).tobytes())
+            descendants = subtree[:, subtree[i]].any(1) & (subtree[:, ~subtree[i]].sum(1) == 0)
+            cached_nodes = {nodes[j]: int(n_rep[j]) for j in np.flatnonzero(descendants)}
+            self._cache[key] = (cached_nodes, leaf_rep[subtree[i]].copy())
+
+        df_nodes = tree[["node", "parent", "depth"]].assign(n_rep=n_rep)
+        votes_rep = pd.DataFrame(
+            {
+                "region": np.repeat(leaves, parties.size),
+                "party": np.tile(parties, len(leaves)),
+                "votes": leaf_votes.reshape(-1),
+                "n_rep": leaf_rep.reshape(-1),
+            }
+        )
+        df_rep = pd.DataFrame(
+            {"party": parties, "votes": leaf_votes.sum(0), "n_rep": leaf_rep.sum(0)}
+        )
+        df_rep = df_rep.sort_values("n_rep", ascending=False).reset_index(drop=True)
+        return HierarchicalResult(df_nodes, votes_rep, df_rep, len(computed))
+
+    def _split_level(
+        self,
+        parents: List[int],
+        children: Dict[str, List[str]],
+        position: Dict[str, int],
+        tree: pd.DataFrame,
+        sizes: np.ndarray,
+        n_rep: np.ndarray,
+    ) -> List[int]:
+        """
+        Método que reparte a la vez los escaños de varios nodos entre sus hijos. Cada hijo
+        recibe su mínimo y el resto de escaños se reparte entre los hijos "prov".
+
+        Parameters
+        ----------
+        parents: List[int]
+            Posición de los nodos a repartir.
+        children: Dict[str, List[str]]
+            Hijos de cada nodo.
+        position: Dict[str, int]
+            Posición de cada nodo.
+        tree: pd.DataFrame
+            Tabla del árbol.
+        sizes: np.ndarray
+            Tamaño de cada nodo.
+        n_rep: np.ndarray
+            Escaños de cada nodo, que se actualiza con los escaños de los hijos.
+
+        Returns
+        -------
+        frontier: List[int]
+            Posición de los hijos repartidos.
+        """
+        if not parents:
+            return []
+        child_rows = [[position[c] for c in children[tree.node.values[i]]] for i in parents]
+        n_children = max(len(c) for c in child_rows)
+        index = np.zeros((len(parents), n_children), dtype=int)
+        mask = np.zeros((len(parents), n_children), dtype=bool)
+        for row, rows in enumerate(child_rows):
+            index[row, : len(rows)] = rows
+            mask[row, : len(rows)] = True
+        min_rep = np.where(mask, tree.min_rep.values[index], 0)
+        is_prov = mask & (tree.type_reg.values[index] == "prov")
+        rep_to_share = n_rep[parents] - min_rep.sum(1)
+        if (rep_to_share < 0).any():
+            raise RuntimeError("El mínimo de escaños de los hijos supera los escaños del nodo.")
+        child_rep = min_rep + distributions_representative_matrix(
+            self.method, np.where(is_prov, sizes[index], 0), rep_to_share, eligible=is_prov
+        )
+        n_rep[index[mask]] = child_rep[mask]
+        return index[mask].tolist()
+
+
+def _prepare_tree(tree: pd.DataFrame) -> pd.DataFrame:
+    """
+    Función que completa las columnas opcionales del árbol y lo ordena por profundidad.
+
+    Parameters
+    ----------
+    tree: pd.DataFrame
+        Tabla del árbol.
+
+    Returns
+    -------
+    tree: pd.DataFrame
+        Tabla del árbol con las columnas size, min_rep, type_reg, electoral_barrier y depth.
+    """
+    tree = tree.copy()
+    defaults = {"size": np.nan, "min_rep": 0, "type_reg": "prov", "electoral_barrier": 0.0}
+    for column, value in defaults.items():
+        if column not in tree.columns:
+            tree[column] = value
+    tree["min_rep"] = tree.min_rep.fillna(0).astype(int)
+    tree["type_reg"] = tree.type_reg.fillna("prov")
+    tree["electoral_barrier"] = tree.electoral_barrier.fillna(0.0)
+    if tree.parent.isna().sum() != 1:
+        raise RuntimeError("El árbol tiene que tener una única raíz.")
+
+    parent = tree.set_index("node").parent
+    depth = pd.Series(0, index=parent.index)
+    level = parent[parent.isna()].index
+    while len(level) > 0:
+        level = parent[parent.isin(level)].index
+        depth[level] += depth[parent[level]].values + 1
+    tree["depth"] = depth.loc[tree.node].values
+    return tree.sort_values("depth", kind="stable").reset_index(drop=True)
+
+
+def _get_signatures(
+    tree: pd.DataFrame,
+    children: Dict[str, List[str]],
+    leaf_votes: np.ndarray,
+    leaf_position: Dict[str, int],
+) -> List[bytes]:
+    """
+    Función que calcula de abajo a arriba una firma de cada subárbol con sus nodos,
+    reglas, tamaños y votos.
+
+    Parameters
+    ----------
+    tree: pd.DataFrame
+        Tabla del árbol ordenada por profundidad.
+    children: Dict[str, List[str]]
+        Hijos de cada nodo.
+    leaf_votes: np.ndarray
+        Matriz hojas x partidos con los votos.
+    leaf_position: Dict[str, int]
+        Posición de cada hoja en leaf_votes.
+
+    Returns
+    -------
+    signatures: List[bytes]
+        Firma de cada nodo en el orden de tree.
+    """
+    signatures: Dict[str, bytes] = {}
+    columns = ["node", "size", "min_rep", "type_reg", "electoral_barrier"]
+    for row in reversed(list(tree[columns].itertuples(index=False))):
+        digest = hashlib.blake2b(repr(tuple(row)).encode(), digest_size=16)
+        if row.node in leaf_position:
+            digest.update(leaf_votes[leaf_position[row.node]].tobytes())
+        for child in children.get(row.node, []):
+            digest.update(signatures[child])
+        signatures[row.node] = digest.digest()
+    return [signatures[node] for node in tree.node]
@@ -0,0 +1,364 @@
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from electoral_system_analysis.distribution_formulas import (
+    distributions_representative_matrix,
+    score_proportionality,
+    votes_to_matrix,
+)
+from electoral_system_analysis.distribution_regions import get_representative_by_regions
+
+
+class InverseDesignResult(NamedTuple):
+    """
+    Resultado de una búsqueda inversa.
+
+    value: Optional[float]
+        Valor del parámetro encontrado o None si ningún candidato cumple el objetivo.
+    score: Optional[float]
+        Score de proporcionalidad del valor encontrado.
+    n_evaluations: int
+        Número de ejecuciones del reparto que ha necesitado la búsqueda.
+    scores: pd.Series
+        Score de cada candidato evaluado.
+    """
+
+    value: Optional[float]
+    score: Optional[float]
+    n_evaluations: int
+    scores: pd.Series
+
+
+class ForwardEvaluator:
+    """
+    Clase que ejecuta el reparto completo (escaños por regiones con
+    get_representative_by_regions y escaños por partidos con la fórmula) y guarda los
+    resultados. La barrera electoral sólo cambia el reparto cuando cambia el conjunto de
+    partidos que la superan, por lo que dos barreras con los mismos partidos comparten
+    resultado.
+
+    Parameters
+    ----------
+    formula_name: str
+        Nombre de la fórmula de cálculo del reparto entre partidos.
+    votes: pd.DataFrame
+        Tabla con los votos por partido y regiones.
+    regions: pd.DataFrame
+        Tabla con las columnas reg_el_id, size y type_reg.
+    method: str, default "loreg"
+        Método de reparto de escaños entre regiones.
+    """
+
+    def __init__(
+        self, formula_name: str, votes: pd.DataFrame, regions: pd.DataFrame, method: str = "loreg"
+    ):
+        self.formula_name = formula_name
+        self.method = method
+        self.regions = regions[["reg_el_id", "size", "type_reg"]].reset_index(drop=True)
+        self.votes_matrix, self.parties = votes_to_matrix(votes, self.regions)
+        self.shares = self.votes_matrix / self.votes_matrix.sum(1, keepdims=True)
+        self.n_evaluations = 0
+        self._apportionments: Dict[Tuple[int, int], np.ndarray] = {}
+        self._scores: Dict[Tuple[int, int, bytes], float] = {}
+
+    def apportion(self, n_representative: int, min_representative: int) -> np.ndarray:
+        """
+        Método que devuelve los escaños de cada región en el orden de reg_el_id.
+
+        Parameters
+        ----------
+        n_representative: int
+            Número total de representantes
+        min_representative: int
+            Mínimo de representantes por provincias
+
+        Returns
+        -------
+        n_rep: np.ndarray
+            Escaños de cada región.
+        """
+        key = (n_representative, min_representative)
+        if key not in self._apportionments:
+            df_regions = get_representative_by_regions(
+                self.regions.copy(), n_representative, min_representative, self.method
+            )
+            df_regions = df_regions.set_index("reg_el_id").loc[self.regions.reg_el_id]
+            self._apportionments[key] = df_regions.n_rep.values.astype(int)
+        return self._apportionments[key]
+
+    def score(
+        self, n_representative: int, min_representative: int, electoral_barrier: float
+    ) -> float:
+        """
+        Método que devuelve el score de proporcionalidad de una configuración.
+
+        Parameters
+        ----------
+        n_representative: int
+            Número total de representantes
+        min_representative: int
+            Mínimo de representantes por provincias
+        electoral_barrier: float
+            Valor de la barrera electoral
+
+        Returns
+        -------
+        score: float
+            Score de proporcionalidad del reparto.
+        """
+        eligible = self.shares >= electoral_barrier
+        key = (n_representative, min_representative, np.packbits(eligible).tobytes())
+        if key not in self._scores:
+            self.n_evaluations += 1
+            rep = distributions_representative_matrix(
+                self.formula_name,
+                self.votes_matrix,
+                self.apportion(n_representative, min_representative),
+                eligible=eligible,
+            )
+            self._scores[key] = score_proportionality(
+                pd.Series(rep.sum(0)), pd.Series(self.votes_matrix.sum(0))
+            )
+        return self._scores[key]
+
+    def barrier_breakpoints(self, max_barrier: float = 1.0) -> np.ndarray:
+        """
+        Método que devuelve las barreras en las que cambia el conjunto de partidos que la
+        superan en alguna región. Un partido supera la barrera si su porcentaje es mayor o
+        igual, así que el reparto no cambia entre un punto (sin incluir) y el siguiente
+        (incluido) y cada punto representa a todo su tramo. max_barrier cierra el último
+        tramo.
+
+        Parameters
+        ----------
+        max_barrier: float, default 1.0
+            Barrera máxima a considerar.
+
+        Returns
+        -------
+        breakpoints: np.ndarray
+            Barreras ordenadas de menor a mayor, empezando en 0 y terminando en
+            max_barrier.
+        """
+        shares = self.shares[self.shares <= max_barrier]
+        return np.union1d([0.0, max_barrier], shares)
+
+
+def search_first(
+    candidates: Sequence[float],
+    evaluate: Callable[[float], float],
+    target: float,
+    monotone: bool = False,
+) -> Tuple[Optional[float], Optional[float], Dict[float, float]]:
+    """
+    Función que devuelve el primer candidato, en el orden dado, cuyo score alcanza el
+    objetivo. Si monotone es True se supone que una vez alcanzado el objetivo se cumple
+    para el resto de candidatos y se busca por bisección; en otro caso se recorren los
+    candidatos hasta el primero que lo cumple.
+
+    Parameters
+    ----------
+    candidates: Sequence[float]
+        Valores del parámetro en el orden de búsqueda.
+    evaluate: Callable[[float], float]
+        Función que devuelve el score de un valor del parámetro.
+    target: float
+        Score mínimo a alcanzar.
+    monotone: bool, default False
+        Indica si el cumplimiento del objetivo es monótono a lo largo de los candidatos.
+
+    Returns
+    -------
+    value: Optional[float]
+        Primer candidato que cumple el objetivo o None.
+    score: Optional[float]
+        Score del candidato encontrado.
+    scores: Dict[float, float]
+        Score de cada candidato evaluado.
+    """
+    scores: Dict[float, float] = {}
+
+    def reaches(i: int) -> bool:
+        if candidates[i] not in scores:
+            scores[candidates[i]] = evaluate(candidates[i])
+        return scores[candidates[i]] >= target
+
+    found = None
+    if monotone:
+        low, high = 0, len(candidates) - 1
+        while low <= high:
+            middle = (low + high) // 2
+            if reaches(middle):
+                found = middle
+                high = middle - 1
+            else:
+                low = middle + 1
+    else:
+        found = next((i for i in range(len(candidates)) if reaches(i)), None)
+
+    if found is None:
+        return None, None, scores
+    return candidates[found], scores[candidates[found]], scores
+
+
+def _get_result(
+    evaluator: ForwardEvaluator,
+    name: str,
+    search: Tuple[Optional[float], Optional[float], Dict[float, float]],
+    n_start: int,
+) -> InverseDesignResult:
+    """
+    Función que construye el resultado de una búsqueda.
+
+    Parameters
+    ----------
+    evaluator: ForwardEvaluator
+        Evaluador usado en la búsqueda.
+    name: str
+        Nombre del parámetro buscado.
+    search: Tuple[Optional[float], Optional[float], Dict[float, float]]
+        Salida de search_first.
+    n_start: int
+        Número de evaluaciones del evaluador antes de la búsqueda.
+
+    Returns
+    -------
+    result: InverseDesignResult
+        Resultado de la búsqueda.
+    """
+    value, score, scores = search
+    scores = pd.Series(scores, name="score", dtype=float).sort_index()
+    scores.index.name = name
+    return InverseDesignResult(value, score, evaluator.n_evaluations - n_start, scores)
+
+
+def search_chamber_size(
+    evaluator: ForwardEvaluator,
+    target: float,
+    min_size: int,
+    max_size: int,
+    min_representative: int,
+    electoral_barrier: float = 0.0,
+    monotone: bool = False,
+) -> InverseDesignResult:
+    """
+    Función que busca el menor tamaño de la cámara cuyo score de proporcionalidad alcanza
+    el objetivo.
+
+    Parameters
+    ----------
+    evaluator: ForwardEvaluator
+        Evaluador con los votos y las reglas del sistema.
+    target: float
+        Score mínimo a alcanzar.
+    min_size: int
+        Tamaño mínimo de la cámara.
+    max_size: int
+        Tamaño máximo de la cámara.
+    min_representative: int
+        Mínimo de representantes por provincias
+    electoral_barrier: float, default 0.0
+        Valor de la barrera electoral
+    monotone: bool, default False
+        Si es True se busca por bisección suponiendo que el score crece con la cámara.
+
+    Returns
+    -------
+    result: InverseDesignResult
+        Menor tamaño de la cámara que cumple el objetivo.
+    """
+    n_start = evaluator.n_evaluations
+    search = search_first(
+        list(range(min_size, max_size + 1)),
+        lambda n: evaluator.score(n, min_representative, electoral_barrier),
+        target,
+        monotone,
+    )
+    return _get_result(evaluator, "n_representative", search, n_start)
+
+
+def search_min_representative(
+    evaluator: ForwardEvaluator,
+    target: float,
+    n_representative: int,
+    max_min_representative: int,
+    electoral_barrier: float = 0.0,
+    monotone: bool = False,
+) -> InverseDesignResult:
+    """
+    Función que busca el mayor mínimo de representantes por provincia cuyo score de
+    proporcionalidad alcanza el objetivo.
+
+    Parameters
+    ----------
+    evaluator: ForwardEvaluator
+        Evaluador con los votos y las reglas del sistema.
+    target: float
+        Score mínimo a alcanzar.
+    n_representative: int
+        Número total de representantes
+    max_min_representative: int
+        Mayor mínimo de representantes por provincias a considerar.
+    electoral_barrier: float, default 0.0
+        Valor de la barrera electoral
+    monotone: bool, default False
+        Si es True se busca por bisección suponiendo que el score decrece con el mínimo.
+
+    Returns
+    -------
+    result: InverseDesignResult
+        Mayor mínimo de representantes que cumple el objetivo.
+    """
+    n_start = evaluator.n_evaluations
+    search = search_first(
+        list(range(max_min_representative, -1, -1)),
+        lambda m: evaluator.score(n_representative, m, electoral_barrier),
+        target,
+        monotone,
+    )
+    return _get_result(evaluator, "min_representative", search, n_start)
+
+
+def search_barrier(
+    evaluator: ForwardEvaluator,
+    target: float,
+    n_representative: int,
+    min_representative: int,
+    max_barrier: float = 0.2,
+    monotone: bool = False,
+) -> InverseDesignResult:
+    """
+    Función que busca la mayor barrera electoral cuyo score de proporcionalidad alcanza el
+    objetivo. Sólo se evalúan las barreras en las que cambia el conjunto de partidos que
+    la superan, por lo que el resultado es exacto sin recorrer una rejilla.
+
+    Parameters
+    ----------
+    evaluator: ForwardEvaluator
+        Evaluador con los votos y las reglas del sistema.
+    target: float
+        Score mínimo a alcanzar.
+    n_representative: int
+        Número total de representantes
+    min_representative: int
+        Mínimo de representantes por provincias
+    max_barrier: float, default 0.2
+        Barrera máxima a considerar.
+    monotone: bool, default False
+        Si es True se busca por bisección suponiendo que el score decrece con la barrera.
+
+    Returns
+    -------
+    result: InverseDesignResult
+        Mayor barrera que cumple el objetivo.
+    """
+    n_start = evaluator.n_evaluations
+    search = search_first(
+        list(evaluator.barrier_breakpoints(max_barrier)[::-1]),
+        lambda b: evaluator.score(n_representative, min_representative, b),
+        target,
+        monotone,
+    )
+    return _get_result(evaluator, "electoral_barrier", search, n_start)
@@ -0,0 +1,173 @@
+import os
+from typing import Iterable, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from electoral_system_analysis.distribution_formulas import (
+    distributions_representative_matrix,
+    score_proportionality,
+)
+
+
+class ReplayResult(NamedTuple):
+    """
+    Resultado de reproducir los avances de un escrutinio.
+
+    df_rep: pd.DataFrame
+        Tabla con las columnas snapshot, party, votes y n_rep tras cada avance.
+    df_snapshots: pd.DataFrame
+        Tabla con las columnas snapshot, n_updated (regiones recalculadas) y score.
+    """
+
+    df_rep: pd.DataFrame
+    df_snapshots: pd.DataFrame
+
+
+class LiveCount:
+    """
+    Clase que guarda el estado de un escrutinio en curso: los votos y escaños de cada
+    región y los totales nacionales por partido. Cada actualización sólo vuelve a repartir
+    las regiones que cambian y corrige los totales con la diferencia de sus escaños. Las
+    regiones sin votos todavía no reparten escaños.
+
+    Parameters
+    ----------
+    formula_name: str
+        Nombre de la fórmula de cálculo del reparto.
+    regions: pd.DataFrame
+        Tabla con el reparto de escaños por regiones.
+    electoral_barrier: float, default 0.0
+        Valor de la barrera electoral
+    """
+
+    def __init__(self, formula_name: str, regions: pd.DataFrame, electoral_barrier: float = 0.0):
+        self.formula_name = formula_name
+        self.electoral_barrier = electoral_barrier
+        self.regions = pd.Index(regions.reg_el_id.values)
+        self.n_rep = regions.n_rep.values.astype(int)
+        self.parties = pd.Index([], dtype=object)
+        self.votes = np.zeros((self.regions.size, 0))
+        self.rep = np.zeros((self.regions.size, 0), dtype=int)
+        self.party_votes = np.zeros(0)
+        self.party_rep = np.zeros(0, dtype=int)
+
+    def _add_parties(self, parties: pd.Index) -> None:
+        """
+        Método que añade columnas para los partidos que aparecen por primera vez.
+
+        Parameters
+        ----------
+        parties: pd.Index
+            Partidos de la actualización.
+        """
+        new_parties = parties.difference(self.parties)
+        if new_parties.size == 0:
+            return
+        self.parties = self.parties.append(new_parties)
+        self.votes = np.pad(self.votes, ((0, 0), (0, new_parties.size)))
+        self.rep = np.pad(self.rep, ((0, 0), (0, new_parties.size)))
+        self.party_votes = np.pad(self.party_votes, (0, new_parties.size))
+        self.party_rep = np.pad(self.party_rep, (0, new_parties.size))
+
+    def update(self, deltas: pd.DataFrame, replace: bool = False) -> pd.Index:
+        """
+        Método que aplica una actualización de votos y reparte de nuevo las regiones
+        cuyos votos cambian.
+
+        Parameters
+        ----------
+        deltas: pd.DataFrame
+            Tabla con las columnas region, party y votes.
+        replace: bool, default False
+            Si es True los votos son el total de la región y el partido; si es False se
+            suman a los que ya había.
+
+        Returns
+        -------
+        updated: pd.Index
+            Regiones cuyos votos han cambiado y se han vuelto a repartir.
+        """
+        region_codes = self.regions.get_indexer(deltas.region)
+        if (region_codes < 0).any():
+            unknown = deltas.region[region_codes < 0].unique().tolist()
+            raise ValueError(f"Las regiones {unknown} no están en la tabla de regiones.")
+        self._add_parties(pd.Index(deltas.party.unique()))
+        party_codes = self.parties.get_indexer(deltas.party)
+
+        rows = np.unique(region_codes)
+        old_votes = self.votes[rows].copy()
+        if replace:
+            self.votes[region_codes, party_codes] = deltas.votes.values
+        else:
+            np.add.at(self.votes, (region_codes, party_codes), deltas.votes.values)
+        # Las regiones que vuelven a llegar con los mismos votos no se reparten de nuevo.
+        changed = (self.votes[rows] != old_votes).any(1)
+        rows = rows[changed]
+        self.party_votes += (self.votes[rows] - old_votes[changed]).sum(0)
+        if rows.size == 0 or self.parties.size == 0:
+            return self.regions[rows]
+
+        votes = self.votes[rows]
+        n_rep = np.where(votes.sum(1) > 0, self.n_rep[rows], 0)
+        new_rep = distributions_representative_matrix(
+            self.formula_name, votes, n_rep, self.electoral_barrier
+        )
+        self.party_rep += (new_rep - self.rep[rows]).sum(0)
+        self.rep[rows] = new_rep
+        return self.regions[rows]
+
+    @property
+    def df_rep(self) -> pd.DataFrame:
+        """
+        Tabla con el reparto de escaños por partido en el momento actual.
+        """
+        df_rep = pd.DataFrame(
+            {"party": self.parties, "votes": self.party_votes, "n_rep": self.party_rep}
+        )
+        return df_rep.sort_values("n_rep", ascending=False, kind="stable").reset_index(drop=True)
+
+    def score(self) -> float:
+        """
+        Método que calcula score_proportionality con los totales actuales.
+
+        Returns
+        -------
+        score: float
+            Valor asociado a la proporcionalidad.
+        """
+        return score_proportionality(pd.Series(self.party_rep), pd.Series(self.party_votes))
+
+
+def replay_snapshots(
+    live_count: LiveCount, paths: Iterable[str], replace: bool = True
+) -> ReplayResult:
+    """
+    Función que reproduce un escrutinio a partir de los ficheros de avance guardados, en
+    el orden indicado. Cada fichero es un csv con las columnas region, party y votes.
+
+    Parameters
+    ----------
+    live_count: LiveCount
+        Estado del escrutinio que se actualiza.
+    paths: Iterable[str]
+        Rutas de los ficheros de avance.
+    replace: bool, default True
+        Si es True los ficheros tienen los votos totales de cada región y partido; si es
+        False tienen los votos nuevos.
+
+    Returns
+    -------
+    result: ReplayResult
+        Reparto y score tras cada avance.
+    """
+    tables = []
+    snapshots = []
+    for path in paths:
+        snapshot = os.path.splitext(os.path.basename(path))[0]
+        updated = live_count.update(pd.read_csv(path), replace)
+        tables.append(live_count.df_rep.assign(snapshot=snapshot))
+        snapshots.append((snapshot, updated.size, live_count.score()))
+    df_rep = pd.concat(tables, ignore_index=True)[["snapshot", "party", "votes", "n_rep"]]
+    df_snapshots = pd.DataFrame(snapshots, columns=["snapshot", "n_updated", "score"])
+    return ReplayResult(df_rep, df_snapshots)
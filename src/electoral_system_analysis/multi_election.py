@@ -0,0 +1,246 @@
+from typing import Dict, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from electoral_system_analysis.clean_electoral_data import format_serie_values
+from electoral_system_analysis.distribution_formulas import distributions_representative_matrix
+from electoral_system_analysis.party_index import PartyIndex, map_party_ids
+
+# Nombres de las regiones en otras elecciones y su codename en region_table_2019.
+REGION_ALIASES = {
+    "Alacant/Alicante": "alicante_alacant",
+    "Castelló/Castellón": "castellon_castello",
+}
+
+
+class VoteTensor(NamedTuple):
+    """
+    Votos de varias elecciones alineados por región y partido.
+
+    votes: np.ndarray
+        Tensor elecciones x regiones x partidos con los votos.
+    elections: pd.Index
+        Elecciones asociadas al primer eje.
+    regions: pd.Index
+        Regiones asociadas al segundo eje.
+    parties: pd.Index
+        Partidos asociados al tercer eje.
+    """
+
+    votes: np.ndarray
+    elections: pd.Index
+    regions: pd.Index
+    parties: pd.Index
+
+
+def _get_party_keys(
+    data: pd.DataFrame, party_column: str, party_index: Optional[PartyIndex]
+) -> pd.Series:
+    """
+    Función que devuelve la clave de partido de cada fila. Con índice de partidos la clave
+    es el party_id, o el coalition_id si sólo se identifica la coalición; en otro caso
+    es la etiqueta normalizada.
+
+    Parameters
+    ----------
+    data: pd.DataFrame
+        Tabla de la elección.
+    party_column: str
+        Nombre de la columna con la etiqueta del partido.
+    party_index: Optional[PartyIndex]
+        Índice de identidad de partidos.
+
+    Returns
+    -------
+    keys: pd.Series
+        Clave de partido de cada fila.
+    """
+    labels = format_serie_values(data[party_column].astype(str))
+    if party_index is None:
+        return labels
+    mapped = map_party_ids(data[[party_column]], party_column, party_index)
+    keys = labels.values.astype(object)
+    is_coalition = mapped.coalition_id.notna().values
+    keys[is_coalition] = "coalition_" + mapped.coalition_id[is_coalition].astype(str).values
+    is_party = mapped.party_id.notna().values
+    keys[is_party] = "party_" + mapped.party_id[is_party].astype(str).values
+    return pd.Series(keys, index=data.index)
+
+
+def create_vote_tensor(
+    elections: Dict[str, pd.DataFrame],
+    region_column: str = "region",
+    party_column: str = "party",
+    votes_column: str = "votes",
+    party_index: Optional[PartyIndex] = None,
+    regions: Optional[Sequence[str]] = None,
+    region_aliases: Optional[Dict[str, str]] = None,
+) -> VoteTensor:
+    """
+    Función que alinea varias elecciones limpias en un tensor elecciones x regiones x
+    partidos. Las regiones se identifican por su nombre normalizado con
+    format_serie_values y traducido con region_aliases, de forma que los nombres
+    bilingües escritos en otro orden, como Alacant/Alicante, se asignan al codename de
+    region_table_2019. Todas las elecciones tienen que tener las mismas regiones, o
+    todas las de regions si se indica, y si no se lanza un error con las que faltan. Los
+    partidos se identifican con el índice de partidos si se indica y un partido que no se
+    presenta en una elección tiene cero votos.
+
+    Parameters
+    ----------
+    elections: Dict[str, pd.DataFrame]
+        Diccionario con el nombre de cada elección y su tabla de votos, por ejemplo la
+        salida de clean_2019 o de read_data_2023_rtve.
+    region_column: str, default "region"
+        Nombre de la columna con la región.
+    party_column: str, default "party"
+        Nombre de la columna con el partido.
+    votes_column: str, default "votes"
+        Nombre de la columna con los votos.
+    party_index: Optional[PartyIndex], default None
+        Índice de identidad de partidos para unificar las etiquetas.
+    regions: Optional[Sequence[str]], default None
+        Regiones del tensor, por ejemplo la columna codename de region_table_2019. Las
+        filas de otras regiones se descartan. Si es None se usan todas las regiones.
+    region_aliases: Optional[Dict[str, str]], default None
+        Diccionario con otros nombres de una región y su codename. Si es None se usa
+        REGION_ALIASES.
+
+    Returns
+    -------
+    vote_tensor: VoteTensor
+        Votos alineados de todas las elecciones.
+    """
+    if region_aliases is None:
+        region_aliases = REGION_ALIASES
+    aliases = dict(
+        zip(
+            format_serie_values(pd.Series(list(region_aliases.keys()), dtype=object)),
+            format_serie_values(pd.Series(list(region_aliases.values()), dtype=object)),
+        )
+    )
+
+    tables = []
+    for name, data in elections.items():
+        region_names = format_serie_values(data[region_column].astype(str))
+        table = pd.DataFrame(
+            {
+                "election": name,
+                "region": region_names.replace(aliases).values,
+                "party": _get_party_keys(data, party_column, party_index).values,
+                "votes": data[votes_column].astype(float).values,
+            }
+        )
+        tables.append(table)
+    table = pd.concat(tables, ignore_index=True)
+
+    if regions is None:
+        regions = pd.Index(table.region.unique())
+    else:
+        regions = pd.Index(format_serie_values(pd.Series(regions, dtype=object)).unique())
+        table = table[table.region.isin(regions)]
+    regions = regions.sort_values()
+    missing = {
+        name: regions.difference(table.region[table.election == name]).tolist()
+        for name in elections
+    }
+    missing = {name: values for name, values in missing.items() if values}
+    if missing:
+        raise ValueError(f"Faltan regiones en las elecciones {missing}. Revisa region_aliases.")
+
+    election_codes = pd.Categorical(table.election, categories=list(elections)).codes
+    region_codes = pd.Categorical(table.region, categories=regions).codes
+    party_codes, parties = pd.factorize(table.party, sort=True)
+    votes = np.zeros((len(elections), regions.size, parties.size))
+    np.add.at(votes, (election_codes, region_codes, party_codes), table.votes.values)
+    return VoteTensor(votes, pd.Index(list(elections)), regions, pd.Index(parties))
+
+
+def distributions_representative_tensor(
+    formula_name: str,
+    vote_tensor: VoteTensor,
+    n_rep: Union[pd.Series, pd.DataFrame, np.ndarray],
+    electoral_barrier: float = 0.0,
+) -> np.ndarray:
+    """
+    Función que aplica la fórmula de reparto a todas las elecciones del tensor en una
+    sola llamada.
+
+    Parameters
+    ----------
+    formula_name: str
+        Nombre de la fórmula de cálculo del reparto.
+    vote_tensor: VoteTensor
+        Votos alineados de todas las elecciones.
+    n_rep: Union[pd.Series, pd.DataFrame, np.ndarray]
+        Escaños de cada región, comunes (Serie indexada por región) o por elección (tabla
+        elecciones x regiones).
+    electoral_barrier: float, default 0.0
+        Valor de la barrera electoral
+
+    Returns
+    -------
+    rep: np.ndarray
+        Tensor elecciones x regiones x partidos con los escaños.
+    """
+    if isinstance(n_rep, pd.Series):
+        n_rep = n_rep.reindex(vote_tensor.regions).values
+    elif isinstance(n_rep, pd.DataFrame):
+        n_rep = n_rep.reindex(index=vote_tensor.elections, columns=vote_tensor.regions).values
+    return distributions_representative_matrix(
+        formula_name, vote_tensor.votes, n_rep, electoral_barrier
+    )
+
+
+def get_tensor_rep(vote_tensor: VoteTensor, rep: np.ndarray) -> pd.DataFrame:
+    """
+    Función que resume el reparto de todas las elecciones por partido.
+
+    Parameters
+    ----------
+    vote_tensor: VoteTensor
+        Votos alineados de todas las elecciones.
+    rep: np.ndarray
+        Tensor elecciones x regiones x partidos con los escaños.
+
+    Returns
+    -------
+    df_rep: pd.DataFrame
+        Tabla con las columnas election, party, votes y n_rep.
+    """
+    index = pd.MultiIndex.from_product(
+        (vote_tensor.elections, vote_tensor.parties), names=["election", "party"]
+    )
+    df_rep = pd.DataFrame(
+        {
+            "votes": vote_tensor.votes.sum(1).reshape(-1),
+            "n_rep": rep.sum(1).reshape(-1),
+        },
+        index=index,
+    )
+    return df_rep.reset_index()
+
+
+def score_proportionality_tensor(vote_tensor: VoteTensor, rep: np.ndarray) -> pd.Series:
+    """
+    Función que calcula score_proportionality de cada elección del tensor.
+
+    Parameters
+    ----------
+    vote_tensor: VoteTensor
+        Votos alineados de todas las elecciones.
+    rep: np.ndarray
+        Tensor elecciones x regiones x partidos con los escaños.
+
+    Returns
+    -------
+    scores: pd.Series
+        Score de proporcionalidad de cada elección.
+    """
+    votes = vote_tensor.votes.sum(1)
+    representative = rep.sum(1)
+    error_abs = np.abs(
+        representative / representative.sum(1, keepdims=True) - votes / votes.sum(1, keepdims=True)
+    )
+    return pd.Series(1 - error_abs.sum(1), index=vote_tensor.elections, name="score")
@@ -0,0 +1,243 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from electoral_system_analysis.distribution_formulas import (
+    DIVISOR_FORMULAS,
+    QUOTA_FORMULAS,
+    DivisorFunction,
+    FormulaDosntExist,
+    QuotaFunction,
+)
+
+# Tramos de población y número de concejales según el artículo 179 de la LOREG.
+POPULATION_LIMITS = (100, 250, 1000, 2000, 5000, 10000, 20000, 50000, 100000)
+COUNCIL_SIZES = (3, 5, 7, 9, 11, 13, 17, 21, 25)
+
+
+def get_council_size(
+    population: np.ndarray,
+    population_limits: Sequence[int] = POPULATION_LIMITS,
+    council_sizes: Sequence[int] = COUNCIL_SIZES,
+) -> np.ndarray:
+    """
+    Función que devuelve el número de concejales de cada municipio según su población. Por
+    encima del último tramo se añade un concejal por cada 100.000 residentes o fracción y
+    uno más si el resultado es par.
+
+    Parameters
+    ----------
+    population: np.ndarray
+        Población de cada municipio.
+    population_limits: Sequence[int], default POPULATION_LIMITS
+        Límite superior de población de cada tramo.
+    council_sizes: Sequence[int], default COUNCIL_SIZES
+        Número de concejales de cada tramo.
+
+    Returns
+    -------
+    n_rep: np.ndarray
+        Número de concejales de cada municipio.
+    """
+    population = np.asarray(population)
+    position = np.searchsorted(population_limits, population, side="left")
+    sizes = np.asarray(council_sizes)[np.minimum(position, len(council_sizes) - 1)]
+    extra = np.ceil((population - population_limits[-1]) / 100000).astype(int)
+    big_sizes = council_sizes[-1] + extra
+    big_sizes += big_sizes % 2 == 0
+    return np.where(position >= len(population_limits), big_sizes, sizes)
+
+
+def distributions_representative_municipal(
+    formula_name: str,
+    votes: pd.DataFrame,
+    municipalities: pd.DataFrame,
+    electoral_barrier: float = 0.05,
+    chunk_size: int = 2000,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Función que reparte los concejales de miles de municipios a la vez. Cada municipio es
+    un segmento de la tabla de votos y el reparto se hace con una ordenación por segmentos
+    sin crear una tabla por municipio. Los municipios se procesan por bloques de
+    chunk_size para acotar la memoria.
+
+    Parameters
+    ----------
+    formula_name: str
+        Nombre de la fórmula de cálculo del reparto.
+    votes: pd.DataFrame
+        Tabla con las columnas municipality, party y votes.
+    municipalities: pd.DataFrame
+        Tabla con la columna municipality y la columna n_rep o population. Si tiene la
+        columna valid_votes la barrera se calcula sobre ella, que incluye el voto en blanco.
+    electoral_barrier: float, default 0.05
+        Valor de la barrera electoral
+    chunk_size: int, default 2000
+        Número de municipios de cada bloque.
+
+    Returns
+    -------
+    votes_rep: pd.DataFrame
+        Tabla de votos con la columna n_rep con los concejales de cada candidatura.
+    df_rep: pd.DataFrame
+        Tabla con el reparto nacional de concejales por partido.
+    """
+    if formula_name not in DIVISOR_FORMULAS and formula_name not in QUOTA_FORMULAS:
+        raise FormulaDosntExist(
+            f"El método {formula_name} no existe. "
+            f"Prueba con {list(DIVISOR_FORMULAS) + list(QUOTA_FORMULAS)}."
+        )
+    municipalities = municipalities.set_index("municipality")
+    if "n_rep" in municipalities.columns:
+        n_rep = municipalities.n_rep.astype(int)
+    else:
+        n_rep = pd.Series(get_council_size(municipalities.population), municipalities.index)
+
+    votes_rep = votes.sort_values("municipality", kind="stable").reset_index(drop=True)
+    codes, uniques = pd.factorize(votes_rep.municipality)
+    seats = n_rep.reindex(uniques).fillna(0).values.astype(int)
+    if "valid_votes" in municipalities.columns:
+        base = municipalities.valid_votes.reindex(uniques).values.astype(float)
+    else:
+        base = np.bincount(codes, weights=votes_rep.votes.values)
+    eligible = votes_rep.votes.values >= electoral_barrier * base[codes]
+    no_votes = np.bincount(codes, weights=eligible, minlength=uniques.size) == 0
+    if (no_votes & (seats > 0)).any():
+        raise RuntimeError(
+            f"No hay votos para ningún partido en esta región que hayan "
+            f"superado la barrera electoral de {electoral_barrier*100} %."
+        )
+
+    result = np.zeros(votes_rep.shape[0], dtype=int)
+    bounds = np.searchsorted(codes, np.arange(0, uniques.size + chunk_size, chunk_size))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if start == end:
+            continue
+        chunk_codes = codes[start:end] - codes[start]
+        arguments = (
+            votes_rep.votes.values[start:end].astype(float),
+            chunk_codes,
+            seats[codes[start] : codes[end - 1] + 1],
+            eligible[start:end],
+        )
+        if formula_name in DIVISOR_FORMULAS:
+            result[start:end] = _segmented_divisor(DIVISOR_FORMULAS[formula_name], *arguments)
+        else:
+            result[start:end] = _segmented_quota(QUOTA_FORMULAS[formula_name], *arguments)
+    votes_rep["n_rep"] = result
+
+    df_rep = votes_rep.groupby("party")[["votes", "n_rep"]].sum()
+    df_rep = df_rep.sort_values("n_rep", ascending=False).reset_index()
+    return votes_rep, df_rep
+
+
+def _segment_ranks(segment: np.ndarray, key: np.ndarray, n_segments: int) -> np.ndarray:
+    """
+    Función que devuelve la posición de cada elemento dentro de su segmento ordenando de
+    mayor a menor por key y, en caso de empate, por orden de aparición.
+
+    Parameters
+    ----------
+    segment: np.ndarray
+        Segmento de cada elemento.
+    key: np.ndarray
+        Valor por el que se ordena.
+    n_segments: int
+        Número de segmentos.
+
+    Returns
+    -------
+    ranks: np.ndarray
+        Posición de cada elemento dentro de su segmento.
+    """
+    order = np.lexsort((np.arange(segment.size), -key, segment))
+    starts = np.concatenate(([0], np.cumsum(np.bincount(segment, minlength=n_segments))[:-1]))
+    ranks = np.empty(segment.size, dtype=int)
+    ranks[order] = np.arange(segment.size) - starts[segment[order]]
+    return ranks
+
+
+def _segmented_divisor(
+    divisor: DivisorFunction,
+    votes: np.ndarray,
+    codes: np.ndarray,
+    seats: np.ndarray,
+    eligible: np.ndarray,
+) -> np.ndarray:
+    """
+    Función que reparte con un método de divisores los escaños de todos los segmentos. Cada
+    candidatura genera tantos cocientes como escaños tiene su municipio.
+
+    Parameters
+    ----------
+    divisor: DivisorFunction
+        Función que devuelve el divisor del escaño k (empezando en 0).
+    votes: np.ndarray
+        Votos de cada candidatura.
+    codes: np.ndarray
+        Municipio de cada candidatura, ordenado.
+    seats: np.ndarray
+        Escaños de cada municipio.
+    eligible: np.ndarray
+        Candidaturas que superan la barrera electoral.
+
+    Returns
+    -------
+    n_rep: np.ndarray
+        Escaños de cada candidatura.
+    """
+    row_seats = seats[codes]
+    row = np.repeat(np.arange(votes.size), row_seats)
+    k = np.arange(row.size) - np.repeat(np.cumsum(row_seats) - row_seats, row_seats)
+    divisors = divisor(k)
+    quotients = votes[row] / divisors
+    integer = divisors == np.floor(divisors)
+    quotients[integer] = np.floor(quotients[integer])
+    quotients[~eligible[row]] = -np.inf
+    ranks = _segment_ranks(codes[row], quotients, seats.size)
+    selected = ranks < row_seats[row]
+    return np.bincount(row[selected], minlength=votes.size)
+
+
+def _segmented_quota(
+    quota: QuotaFunction,
+    votes: np.ndarray,
+    codes: np.ndarray,
+    seats: np.ndarray,
+    eligible: np.ndarray,
+) -> np.ndarray:
+    """
+    Función que reparte con un método de cociente y restos mayores los escaños de todos
+    los segmentos.
+
+    Parameters
+    ----------
+    quota: QuotaFunction
+        Función que devuelve el cociente a partir de los votos totales y los escaños.
+    votes: np.ndarray
+        Votos de cada candidatura.
+    codes: np.ndarray
+        Municipio de cada candidatura, ordenado.
+    seats: np.ndarray
+        Escaños de cada municipio.
+    eligible: np.ndarray
+        Candidaturas que superan la barrera electoral.
+
+    Returns
+    -------
+    n_rep: np.ndarray
+        Escaños de cada candidatura.
+    """
+    votes = np.where(eligible, votes, 0)
+    total = np.bincount(codes, weights=votes, minlength=seats.size)
+    coeff = np.maximum(quota(total, np.maximum(seats, 1)), 1)[codes]
+    n_rep = (votes // coeff).astype(int)
+    rest_votes = np.where(eligible, votes - n_rep * coeff, -np.inf)
+    rest_n_rep = seats - np.bincount(codes, weights=n_rep, minlength=seats.size).astype(int)
+    # Si sobran más escaños que candidaturas con escaño posible se dan por turnos entre ellas.
+    n_eligible = np.maximum(np.bincount(codes, weights=eligible, minlength=seats.size), 1)
+    ranks = _segment_ranks(codes, rest_votes, seats.size)
+    extra = -((ranks - rest_n_rep[codes]) // n_eligible[codes].astype(int))
+    n_rep += np.where(eligible, np.maximum(extra, 0), 0)
+    return np.where(seats[codes] > 0, n_rep, 0)
@@ -0,0 +1,262 @@
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from electoral_system_analysis.clean_electoral_data import format_serie_values
+
+
+class PartyIndex(NamedTuple):
+    """
+    Índice de identidad de partidos.
+
+    keys: pd.DataFrame
+        Tabla con una fila por clave normalizada y las columnas key, party_id y coalition_id.
+    ngrams: Dict[str, np.ndarray]
+        Índice invertido que asocia cada n-grama con las posiciones de keys que lo contienen.
+    n_keys_grams: np.ndarray
+        Número de n-gramas distintos de cada clave.
+    ngram_size: int
+        Tamaño de los n-gramas.
+    """
+
+    keys: pd.DataFrame
+    ngrams: Dict[str, np.ndarray]
+    n_keys_grams: np.ndarray
+    ngram_size: int
+
+
+def get_ngrams(value: str, ngram_size: int = 3) -> List[str]:
+    """
+    Función que devuelve los n-gramas distintos de una cadena. Las cadenas más cortas que
+    ngram_size devuelven la propia cadena como único n-grama.
+
+    Parameters
+    ----------
+    value: str
+        Cadena de la que se sacan los n-gramas.
+    ngram_size: int
+        Tamaño de los n-gramas.
+
+    Returns
+    -------
+    ngrams: List[str]
+        Lista con los n-gramas distintos ordenados.
+    """
+    if len(value) <= ngram_size:
+        return [value]
+    return sorted({value[i : i + ngram_size] for i in range(len(value) - ngram_size + 1)})
+
+
+def create_party_index(
+    df_parties: pd.DataFrame,
+    df_coalitions: Optional[pd.DataFrame] = None,
+    df_relations: Optional[pd.DataFrame] = None,
+    ngram_size: int = 3,
+) -> PartyIndex:
+    """
+    Función que crea el índice de identidad de partidos a partir de las tablas de partidos
+    y coaliciones (bbdd_partidos.csv, bbdd_coaliciones.csv y bbdd_coaliciones_relaciones.csv).
+    Cada nombre y siglas se normalizan con format_serie_values. Cuando una clave aparece
+    en varios registros se queda la del partido frente a la de la coalición.
+
+    Parameters
+    ----------
+    df_parties: pd.DataFrame
+        Tabla de partidos con las columnas id, name e initialis.
+    df_coalitions: Optional[pd.DataFrame], default None
+        Tabla de coaliciones con las columnas id, name e initialis.
+    df_relations: Optional[pd.DataFrame], default None
+        Tabla que relaciona coalition_id con political_party_id.
+    ngram_size: int, default 3
+        Tamaño de los n-gramas del índice invertido.
+
+    Returns
+    -------
+    party_index: PartyIndex
+        Índice de identidad de partidos.
+    """
+    parties = pd.concat(
+        (
+            df_parties[["id", "name"]].rename(columns={"name": "label"}),
+            df_parties[["id", "initialis"]].rename(columns={"initialis": "label"}),
+        )
+    ).rename(columns={"id": "party_id"})
+    parties["coalition_id"] = np.nan
+    if df_relations is not None:
+        relations = df_relations.drop_duplicates("political_party_id").set_index(
+            "political_party_id"
+        )
+        parties["coalition_id"] = parties.party_id.map(relations.coalition_id)
+    parties["priority"] = 0
+
+    keys = [parties]
+    if df_coalitions is not None:
+        coalitions = pd.concat(
+            (
+                df_coalitions[["id", "name"]].rename(columns={"name": "label"}),
+                df_coalitions[["id", "initialis"]].rename(columns={"initialis": "label"}),
+            )
+        ).rename(columns={"id": "coalition_id"})
+        coalitions["party_id"] = np.nan
+        coalitions["priority"] = 1
+        keys.append(coalitions)
+
+    keys = pd.concat(keys, ignore_index=True).dropna(subset=["label"])
+    keys["key"] = format_serie_values(keys.label.astype(str))
+    keys = keys.sort_values(["priority", "party_id", "coalition_id"], kind="stable")
+    keys = keys.drop_duplicates("key").reset_index(drop=True)
+    keys = keys[["key", "party_id", "coalition_id"]].astype(
+        {"party_id": "Int64", "coalition_id": "Int64"}
+    )
+
+    postings: Dict[str, List[int]] = {}
+    n_keys_grams = np.zeros(keys.shape[0], dtype=int)
+    for position, key in enumerate(keys.key.values):
+        grams = get_ngrams(key, ngram_size)
+        n_keys_grams[position] = len(grams)
+        for gram in grams:
+            postings.setdefault(gram, []).append(position)
+    ngrams = {gram: np.array(positions) for gram, positions in postings.items()}
+    return PartyIndex(keys, ngrams, n_keys_grams, ngram_size)
+
+
+def read_party_index(
+    path_parties: str,
+    path_coalitions: Optional[str] = None,
+    path_relations: Optional[str] = None,
+    ngram_size: int = 3,
+) -> PartyIndex:
+    """
+    Función que lee las tablas de partidos y coaliciones y crea el índice de identidad.
+
+    Parameters
+    ----------
+    path_parties: str
+        Ruta del archivo bbdd_partidos.csv.
+    path_coalitions: Optional[str], default None
+        Ruta del archivo bbdd_coaliciones.csv.
+    path_relations: Optional[str], default None
+        Ruta del archivo bbdd_coaliciones_relaciones.csv.
+    ngram_size: int, default 3
+        Tamaño de los n-gramas del índice invertido.
+
+    Returns
+    -------
+    party_index: PartyIndex
+        Índice de identidad de partidos.
+    """
+    df_parties = pd.read_csv(path_parties)
+    df_coalitions = pd.read_csv(path_coalitions) if path_coalitions else None
+    df_relations = pd.read_csv(path_relations) if path_relations else None
+    return create_party_index(df_parties, df_coalitions, df_relations, ngram_size)
+
+
+def search_party_keys(
+    values: pd.Series,
+    party_index: PartyIndex,
+    min_similarity: float = 0.65,
+    min_margin: float = 0.1,
+) -> pd.DataFrame:
+    """
+    Función que busca de manera aproximada las claves normalizadas en el índice de partidos.
+    La similitud es el coeficiente de Dice sobre los n-gramas y sólo se puntúan las claves
+    que comparten algún n-grama con el valor buscado, por lo que no se compara cada valor
+    con todas las claves.
+
+    Parameters
+    ----------
+    values: pd.Series
+        Serie con las claves normalizadas a buscar.
+    party_index: PartyIndex
+        Índice de identidad de partidos.
+    min_similarity: float, default 0.65
+        Similitud mínima para aceptar una clave.
+    min_margin: float, default 0.1
+        Diferencia mínima entre la similitud de la mejor clave y la de la mejor clave de
+        otro partido o coalición. Si es menor la coincidencia es ambigua y no se acepta.
+
+    Returns
+    -------
+    matches: pd.DataFrame
+        Tabla con las columnas value, key y match_score. Los valores sin coincidencia
+        tienen key nula.
+    """
+    n_keys = party_index.keys.shape[0]
+    identity, _ = pd.factorize(
+        party_index.keys.party_id.astype(str) + "_" + party_index.keys.coalition_id.astype(str)
+    )
+    matched_keys = []
+    scores = np.zeros(len(values))
+    for i, value in enumerate(values.values):
+        grams = get_ngrams(value, party_index.ngram_size)
+        postings = [party_index.ngrams[g] for g in grams if g in party_index.ngrams]
+        if not postings:
+            matched_keys.append(None)
+            continue
+        shared = np.bincount(np.concatenate(postings), minlength=n_keys)
+        similarity = 2 * shared / (len(grams) + party_index.n_keys_grams)
+        best = similarity.argmax()
+        second = similarity[identity != identity[best]].max(initial=0)
+        if similarity[best] < min_similarity or similarity[best] - second < min_margin:
+            matched_keys.append(None)
+            continue
+        matched_keys.append(party_index.keys.key.values[best])
+        scores[i] = similarity[best]
+    return pd.DataFrame({"value": values.values, "key": matched_keys, "match_score": scores})
+
+
+def map_party_ids(
+    data: pd.DataFrame,
+    column: str,
+    party_index: PartyIndex,
+    min_similarity: float = 0.65,
+    min_margin: float = 0.1,
+) -> pd.DataFrame:
+    """
+    Función que asigna a cada fila de una elección limpia el identificador canónico del
+    partido. Las etiquetas se normalizan una sola vez por valor distinto, se buscan de
+    manera exacta y sólo las que no aparecen se buscan de manera aproximada. El resultado
+    se obtiene con un único join sobre la tabla.
+
+    Parameters
+    ----------
+    data: pd.DataFrame
+        Tabla de la elección, por ejemplo la salida de clean_2019 (political_parties),
+        read_data_2023 (party_initialis) o read_data_2023_rtve (Partidos).
+    column: str
+        Nombre de la columna con la etiqueta del partido.
+    party_index: PartyIndex
+        Índice de identidad de partidos.
+    min_similarity: float, default 0.65
+        Similitud mínima para aceptar una coincidencia aproximada.
+    min_margin: float, default 0.1
+        Diferencia mínima con la similitud de otro partido o coalición para aceptar una
+        coincidencia aproximada.
+
+    Returns
+    -------
+    data: pd.DataFrame
+        Tabla con las columnas party_id, coalition_id y match_score añadidas. La
+        match_score vale 1 para las coincidencias exactas y 0 para las no encontradas.
+    """
+    labels = pd.Series(data[column].dropna().unique())
+    mapping = pd.DataFrame({"label": labels, "value": format_serie_values(labels.astype(str))})
+    keys = party_index.keys.key
+    mapping["key"] = mapping.value.where(mapping.value.isin(keys))
+    mapping["match_score"] = mapping.key.notna().astype(float)
+
+    mask_fuzzy = mapping.key.isna()
+    if mask_fuzzy.any():
+        fuzzy = search_party_keys(
+            mapping.loc[mask_fuzzy, "value"], party_index, min_similarity, min_margin
+        )
+        mapping.loc[mask_fuzzy, "key"] = fuzzy.key.values
+        mapping.loc[mask_fuzzy, "match_score"] = fuzzy.match_score.values
+
+    mapping = mapping.merge(party_index.keys, on="key", how="left")
+    mapping = mapping[["label", "party_id", "coalition_id", "match_score"]]
+    mapping = mapping.rename(columns={"label": column})
+    result = data.merge(mapping, on=column, how="left")
+    result["match_score"] = result.match_score.fillna(0.0)
+    return result
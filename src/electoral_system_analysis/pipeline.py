@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import pandas as pd
+
+
+class PipelineStep(NamedTuple):
+    """
+    Paso de la limpieza de datos.
+
+    name: str
+        Nombre único del paso.
+    function: Callable[..., Any]
+        Función de nivel de módulo que ejecuta el paso y escribe sus salidas.
+    inputs: Tuple[str, ...]
+        Rutas de los ficheros que lee el paso.
+    outputs: Tuple[str, ...]
+        Rutas de los ficheros que escribe el paso.
+    kwargs: Dict[str, Any]
+        Argumentos de la función.
+    """
+
+    name: str
+    function: Callable[..., Any]
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    kwargs: Dict[str, Any] = {}
+
+
+def get_file_hash(path: str, block_size: int = 2**20) -> str:
+    """
+    Función que calcula el hash del contenido de un fichero leyéndolo por bloques.
+
+    Parameters
+    ----------
+    path: str
+        Ruta del fichero.
+    block_size: int, default 2**20
+        Tamaño de los bloques leídos.
+
+    Returns
+    -------
+    file_hash: str
+        Hash hexadecimal del contenido.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _get_signature(step: PipelineStep) -> Dict[str, Any]:
+    """
+    Función que resume lo que determina el resultado de un paso: su función, sus
+    argumentos y el contenido de sus entradas.
+
+    Parameters
+    ----------
+    step: PipelineStep
+        Paso de la limpieza.
+
+    Returns
+    -------
+    signature: Dict[str, Any]
+        Firma del paso.
+    """
+    missing = [path for path in step.inputs if not os.path.exists(path)]
+    if missing:
+        raise FileNotFoundError(f"Faltan las entradas {missing} del paso {step.name}.")
+    return {
+        "function": f"{step.function.__module__}.{step.function.__qualname__}",
+        "kwargs": repr(sorted(step.kwargs.items())),
+        "inputs": {path: get_file_hash(path) for path in step.inputs},
+    }
+
+
+def _is_up_to_date(step: PipelineStep, signature: Dict[str, Any], entry: Optional[Dict]) -> bool:
+    """
+    Función que indica si un paso se puede saltar porque su firma coincide con la del
+    manifiesto y sus salidas no han cambiado.
+
+    Parameters
+    ----------
+    step: PipelineStep
+        Paso de la limpieza.
+    signature: Dict[str, Any]
+        Firma actual del paso.
+    entry: Optional[Dict]
+        Entrada del paso en el manifiesto.
+
+    Returns
+    -------
+    up_to_date: bool
+        True si el paso no necesita ejecutarse.
+    """
+    if entry is None or any(entry.get(key) != value for key, value in signature.items()):
+        return False
+    return all(
+        os.path.exists(path) and get_file_hash(path) == entry["outputs"].get(path)
+        for path in step.outputs
+    )
+
+
+def _run_step(function: Callable[..., Any], kwargs: Dict[str, Any]) -> float:
+    """
+    Función que ejecuta un paso en un proceso del pool.
+
+    Parameters
+    ----------
+    function: Callable[..., Any]
+        Función del paso.
+    kwargs: Dict[str, Any]
+        Argumentos de la función.
+
+    Returns
+    -------
+    seconds: float
+        Tiempo de ejecución.
+    """
+    start = time.perf_counter()
+    function(**kwargs)
+    return time.perf_counter() - start
+
+
+def _get_dependencies(steps: Sequence[PipelineStep]) -> Dict[str, set]:
+    """
+    Función que calcula de qué pasos depende cada paso a partir de sus entradas y
+    salidas.
+
+    Parameters
+    ----------
+    steps: Sequence[PipelineStep]
+        Pasos de la limpieza.
+
+    Returns
+    -------
+    dependencies: Dict[str, set]
+        Pasos que tienen que terminar antes de cada paso.
+    """
+    names = [step.name for step in steps]
+    if len(set(names)) != len(names):
+        raise ValueError("Los nombres de los pasos tienen que ser únicos.")
+    producers = {}
+    for step in steps:
+        for output in step.outputs:
+            if output in producers:
+                raise ValueError(f"La salida {output} la escriben varios pasos.")
+            producers[output] = step.name
+    return {
+        step.name: {producers[path] for path in step.inputs if path in producers} for step in steps
+    }
+
+
+def run_pipeline(
+    steps: Sequence[PipelineStep],
+    manifest_path: str,
+    max_workers: Optional[int] = None,
+    force: bool = False,
+    verbose: bool = True,
+) -> pd.DataFrame:
+    """
+    Función que ejecuta los pasos de la limpieza en un pool de procesos, lanzando cada
+    paso en cuanto terminan los pasos que escriben sus entradas. Los pasos cuyas entradas,
+    función y argumentos coinciden con los del manifiesto y cuyas salidas no han cambiado
+    se saltan. El manifiesto se guarda en json tras cada paso. Si a un paso le faltan
+    entradas o falla, él y los pasos que dependen de él no se ejecutan, el resto de pasos
+    sigue adelante y el primer error se lanza después de imprimir el resumen.
+
+    Parameters
+    ----------
+    steps: Sequence[PipelineStep]
+        Pasos de la limpieza.
+    manifest_path: str
+        Ruta del manifiesto con los hashes de la última ejecución.
+    max_workers: Optional[int], default None
+        Número de procesos.
+    force: bool, default False
+        Si es True se ejecutan todos los pasos.
+    verbose: bool, default True
+        Si es True se imprime el resumen de tiempos.
+
+    Returns
+    -------
+    df_summary: pd.DataFrame
+        Tabla con las columnas step, status (run, skipped, missing si faltan entradas o
+        failed si falla el paso o uno del que depende) y seconds.
+    """
+    dependencies = _get_dependencies(steps)
+    pending = {step.name: step for step in steps}
+    manifest: Dict[str, Dict] = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+
+    def save_manifest() -> None:
+        with open(manifest_path, "w") as file:
+            json.dump(manifest, file, indent=2, sort_keys=True)
+
+    done: set = set()
+    failed: set = set()
+    errors: List[Exception] = []
+    summary: List[Tuple[str, str, float]] = []
+    running: Dict[Future, Tuple[PipelineStep, Dict[str, Any]]] = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # Los pasos que dependen de un paso fallido no se ejecutan.
+            blocked = [name for name in pending if dependencies[name] & failed]
+            for name in blocked:
+                pending.pop(name)
+                summary.append((name, "failed", 0.0))
+                failed.add(name)
+            ready = [name for name in pending if dependencies[name] <= done]
+            if not ready and not running and not blocked and pending:
+                raise RuntimeError(f"Los pasos {list(pending)} tienen dependencias cíclicas.")
+            for name in ready:
+                step = pending.pop(name)
+                try:
+                    signature = _get_signature(step)
+                except FileNotFoundError as error:
+                    errors.append(error)
+                    summary.append((name, "missing", 0.0))
+                    failed.add(name)
+                    continue
+                if not force and _is_up_to_date(step, signature, manifest.get(name)):
+                    summary.append((name, "skipped", 0.0))
+                    done.add(name)
+                    continue
+                for path in step.outputs:
+                    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                running[executor.submit(_run_step, step.function, step.kwargs)] = (
+                    step,
+                    signature,
+                )
+            # Los pasos saltados o fallidos pueden dejar listos otros pasos.
+            if not running or any(
+                dependencies[name] <= done or dependencies[name] & failed for name in pending
+            ):
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                step, signature = running.pop(future)
+                try:
+                    seconds = future.result()
+                except Exception as error:
+                    errors.append(error)
+                    summary.append((step.name, "failed", 0.0))
+                    failed.add(step.name)
+                    continue
+                outputs = {path: get_file_hash(path) for path in step.outputs}
+                manifest[step.name] = dict(signature, outputs=outputs)
+                save_manifest()
+                summary.append((step.name, "run", seconds))
+                done.add(step.name)
+
+    df_summary = pd.DataFrame(summary, columns=["step", "status", "seconds"])
+    if verbose:
+        print(df_summary.to_string(index=False))
+        print(f"Tiempo total: {time.perf_counter() - start:.2f} s")
+    if errors:
+        raise errors[0]
+    return df_summary
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+from electoral_system_analysis.distribution_formulas import (
+    distributions_representative_matrix,
+    votes_to_matrix,
+)
+from electoral_system_analysis.multi_election import VoteTensor
+
+SWING_METHODS = ["uniform", "proportional", "hybrid"]
+
+
+def get_poll_shares(polls: pd.DataFrame, national_shares: pd.Series) -> np.ndarray:
+    """
+    Función que completa las estimaciones de las encuestas con todos los partidos de la
+    elección de referencia. Los partidos que no aparecen en una encuesta se reparten lo
+    que falta hasta 1 en proporción a su resultado nacional.
+
+    Parameters
+    ----------
+    polls: pd.DataFrame
+        Tabla encuestas x partidos con la estimación de voto en tanto por uno.
+    national_shares: pd.Series
+        Porcentaje de voto nacional en tanto por uno de cada partido de la elección de
+        referencia.
+
+    Returns
+    -------
+    shares: np.ndarray
+        Matriz encuestas x partidos con la estimación de voto en el orden de
+        national_shares.
+    """
+    shares = polls.reindex(columns=national_shares.index).values.astype(float)
+    polled = ~np.isnan(shares)
+    shares = np.where(polled, shares, 0)
+    rest = np.clip(1 - shares.sum(1, keepdims=True), 0, None)
+    unpolled = np.where(polled, 0, national_shares.values)
+    unpolled_total = unpolled.sum(1, keepdims=True)
+    shares += np.divide(
+        rest * unpolled, unpolled_total, out=np.zeros(shares.shape), where=unpolled_total > 0
+    )
+    return shares / shares.sum(1, keepdims=True)
+
+
+def get_swing_shares(
+    poll_shares: np.ndarray,
+    region_shares: np.ndarray,
+    national_shares: np.ndarray,
+    method: str = "uniform",
+    uniform_weight: float = 0.5,
+) -> np.ndarray:
+    """
+    Función que aplica el cambio de voto de las encuestas a todas las regiones a la vez.
+    En el cambio uniforme cada partido suma en todas las regiones la diferencia entre la
+    encuesta y su resultado nacional; en el proporcional multiplica su resultado regional
+    por el cociente entre ambos; el híbrido es una media ponderada de los dos. Los
+    porcentajes negativos se ponen a cero y se normalizan en cada región.
+
+    Parameters
+    ----------
+    poll_shares: np.ndarray
+        Matriz encuestas x partidos con la estimación de voto.
+    region_shares: np.ndarray
+        Matriz regiones x partidos con el porcentaje de voto de la elección de referencia.
+    national_shares: np.ndarray
+        Porcentaje de voto nacional de cada partido en la elección de referencia.
+    method: str, default "uniform"
+        Tipo de cambio de voto: uniform, proportional o hybrid.
+    uniform_weight: float, default 0.5
+        Peso del cambio uniforme en el híbrido.
+
+    Returns
+    -------
+    shares: np.ndarray
+        Tensor encuestas x regiones x partidos con el porcentaje de voto estimado.
+    """
+    if method not in SWING_METHODS:
+        raise ValueError(f"El cambio de voto {method} no existe. Prueba con {SWING_METHODS}.")
+    poll_shares = poll_shares[:, None, :]
+    region_shares = region_shares[None, :, :]
+    uniform = region_shares + poll_shares - national_shares
+    ratio = np.divide(
+        poll_shares,
+        national_shares,
+        out=np.zeros(poll_shares.shape),
+        where=national_shares > 0,
+    )
+    proportional = region_shares * ratio
+    weight = {"uniform": 1.0, "proportional": 0.0, "hybrid": uniform_weight}[method]
+    shares = np.clip(weight * uniform + (1 - weight) * proportional, 0, None)
+    total = shares.sum(2, keepdims=True)
+    return np.divide(shares, total, out=np.zeros(shares.shape), where=total > 0)
+
+
+def project_polls(
+    polls: pd.DataFrame,
+    votes: pd.DataFrame,
+    regions: pd.DataFrame,
+    method: str = "uniform",
+    uniform_weight: float = 0.5,
+) -> VoteTensor:
+    """
+    Función que proyecta un conjunto de encuestas sobre los votos por región de una
+    elección de referencia, por ejemplo la salida de clean_2019 o de RTVE 2023, manteniendo
+    los votos totales de cada región.
+
+    Parameters
+    ----------
+    polls: pd.DataFrame
+        Tabla encuestas x partidos con la estimación de voto en tanto por uno. Los
+        partidos que no están en la elección de referencia se descartan.
+    votes: pd.DataFrame
+        Tabla con los votos por partido y regiones de la elección de referencia.
+    regions: pd.DataFrame
+        Tabla con el reparto de escaños por regiones.
+    method: str, default "uniform"
+        Tipo de cambio de voto: uniform, proportional o hybrid.
+    uniform_weight: float, default 0.5
+        Peso del cambio uniforme en el híbrido.
+
+    Returns
+    -------
+    vote_tensor: VoteTensor
+        Votos estimados de cada encuesta por región y partido.
+    """
+    votes_matrix, parties = votes_to_matrix(votes, regions)
+    region_votes = votes_matrix.sum(1, keepdims=True)
+    region_shares = np.divide(
+        votes_matrix, region_votes, out=np.zeros(votes_matrix.shape), where=region_votes > 0
+    )
+    national_shares = pd.Series(votes_matrix.sum(0) / votes_matrix.sum(), index=parties)
+    poll_shares = get_poll_shares(polls, national_shares)
+    shares = get_swing_shares(
+        poll_shares, region_shares, national_shares.values, method, uniform_weight
+    )
+    return VoteTensor(
+        shares * region_votes[None, :, :],
+        pd.Index(polls.index),
+        pd.Index(regions.reg_el_id.values),
+        parties,
+    )
+
+
+def project_seats(
+    formula_name: str,
+    polls: pd.DataFrame,
+    votes: pd.DataFrame,
+    regions: pd.DataFrame,
+    method: str = "uniform",
+    uniform_weight: float = 0.5,
+    electoral_barrier: float = 0.0,
+) -> pd.DataFrame:
+    """
+    Función que calcula los escaños de cada partido en cada encuesta repartiendo todas
+    las encuestas y regiones en una sola llamada.
+
+    Parameters
+    ----------
+    formula_name: str
+        Nombre de la fórmula de cálculo del reparto.
+    polls: pd.DataFrame
+        Tabla encuestas x partidos con la estimación de voto en tanto por uno.
+    votes: pd.DataFrame
+        Tabla con los votos por partido y regiones de la elección de referencia.
+    regions: pd.DataFrame
+        Tabla con el reparto de escaños por regiones.
+    method: str, default "uniform"
+        Tipo de cambio de voto: uniform, proportional o hybrid.
+    uniform_weight: float, default 0.5
+        Peso del cambio uniforme en el híbrido.
+    electoral_barrier: float, default 0.0
+        Valor de la barrera electoral
+
+    Returns
+    -------
+    df_seats: pd.DataFrame
+        Tabla encuestas x partidos con los escaños.
+    """
+    vote_tensor = project_polls(polls, votes, regions, method, uniform_weight)
+    rep = distributions_representative_matrix(
+        formula_name, vote_tensor.votes, regions.n_rep.values, electoral_barrier
+    )
+    return pd.DataFrame(rep.sum(1), index=vote_tensor.elections, columns=vote_tensor.parties)
@@ -0,0 +1,217 @@
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def get_majority_quota(total_rep: int) -> int:
+    """
+    Función que devuelve la mayoría absoluta de una cámara, por ejemplo 176 de 350.
+
+    Parameters
+    ----------
+    total_rep: int
+        Número total de escaños de la cámara.
+
+    Returns
+    -------
+    quota: int
+        Número de escaños necesarios para la mayoría absoluta.
+    """
+    return int(total_rep) // 2 + 1
+
+
+def _coalition_counts(weights: np.ndarray, quota: int) -> np.ndarray:
+    """
+    Función que calcula la función generatriz de las coaliciones de weights truncada por
+    debajo de la cuota: counts[s, k] es el número de coaliciones de s partidos que suman
+    k escaños, con k < quota.
+
+    Parameters
+    ----------
+    weights: np.ndarray
+        Escaños de cada partido, todos mayores que cero.
+    quota: int
+        Cuota de la votación.
+
+    Returns
+    -------
+    counts: np.ndarray
+        Matriz (n_partidos + 1) x quota con el número de coaliciones.
+    """
+    counts = np.zeros((weights.size + 1, quota))
+    counts[0, 0] = 1
+    for n_parties, w in enumerate(weights, start=1):
+        if w < quota:
+            counts[1 : n_parties + 1, w:] += counts[:n_parties, : quota - w].copy()
+    return counts
+
+
+def _remove_party(counts: np.ndarray, weight: int) -> np.ndarray:
+    """
+    Función que elimina de la función generatriz el factor (1 + y x^weight) de un partido,
+    deshaciendo la convolución por orden creciente de escaños.
+
+    Parameters
+    ----------
+    counts: np.ndarray
+        Matriz con el número de coaliciones calculada con _coalition_counts.
+    weight: int
+        Escaños del partido a eliminar.
+
+    Returns
+    -------
+    counts_without: np.ndarray
+        Matriz con el número de coaliciones del resto de partidos.
+    """
+    counts_without = counts[:-1].copy()
+    quota = counts.shape[1]
+    # Cada bloque de weight columnas sólo depende de los bloques anteriores ya resueltos.
+    for k_start in range(weight, quota, weight):
+        k_end = min(k_start + weight, quota)
+        counts_without[1:, k_start:k_end] -= counts_without[:-1, k_start - weight : k_end - weight]
+    return counts_without
+
+
+def power_indices_weights(seats: np.ndarray, quota: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Función que calcula los índices de poder de Banzhaf y de Shapley-Shubik de una cámara
+    mediante programación dinámica sobre los escaños, con coste O(n^2 * quota) en lugar de
+    enumerar las 2^n coaliciones. Los partidos con los mismos escaños tienen el mismo
+    índice, así que se resuelve una vez por cada número de escaños distinto.
+
+    Parameters
+    ----------
+    seats: np.ndarray
+        Escaños de cada partido.
+    quota: int
+        Escaños necesarios para ganar una votación.
+
+    Returns
+    -------
+    banzhaf: np.ndarray
+        Índice de Banzhaf normalizado de cada partido.
+    shapley_shubik: np.ndarray
+        Índice de Shapley-Shubik de cada partido.
+    """
+    seats = np.asarray(seats, dtype=int)
+    banzhaf = np.zeros(seats.size)
+    shapley_shubik = np.zeros(seats.size)
+    mask = seats > 0
+    weights = seats[mask]
+    n_parties = weights.size
+    if n_parties == 0 or quota > weights.sum():
+        return banzhaf, shapley_shubik
+
+    counts = _coalition_counts(weights, quota)
+    # Peso de Shapley-Shubik de una coalición de s partidos: s! (n - s - 1)! / n!
+    size = np.arange(n_parties)
+    log_weight = (
+        _log_factorial(size) + _log_factorial(n_parties - size - 1) - _log_factorial(n_parties)
+    )
+    ss_weight = np.exp(log_weight)
+
+    swings = np.zeros(n_parties)
+    for w in np.unique(weights):
+        counts_without = _remove_party(counts, w)
+        pivotal = counts_without[:, max(quota - w, 0) :]
+        swings[weights == w] = pivotal.sum()
+        shapley_shubik[np.flatnonzero(mask)[weights == w]] = ss_weight @ pivotal.sum(1)
+
+    if swings.sum() > 0:
+        banzhaf[mask] = swings / swings.sum()
+    return banzhaf, shapley_shubik
+
+
+def _log_factorial(values: np.ndarray) -> np.ndarray:
+    """
+    Función que calcula el logaritmo del factorial de cada valor.
+
+    Parameters
+    ----------
+    values: np.ndarray
+        Enteros no negativos.
+
+    Returns
+    -------
+    log_factorial: np.ndarray
+        Logaritmo del factorial de cada valor.
+    """
+    values = np.asarray(values)
+    cum_log = np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, max(values.max(), 0) + 1)))))
+    return cum_log[values]
+
+
+def power_indices(df_rep: pd.DataFrame, quota: Optional[int] = None) -> pd.DataFrame:
+    """
+    Función que calcula los índices de poder de cada partido de la cámara resultante
+    de distributions_representative_by_regions.
+
+    Parameters
+    ----------
+    df_rep: pd.DataFrame
+        Tabla con el reparto de escaños por partido con las columnas party y n_rep.
+    quota: Optional[int], default None
+        Escaños necesarios para ganar una votación. Por defecto la mayoría absoluta.
+
+    Returns
+    -------
+    df_power: pd.DataFrame
+        Tabla df_rep con las columnas banzhaf y shapley_shubik añadidas.
+    """
+    df_power = df_rep.copy()
+    seats = df_power.n_rep.values.astype(int)
+    if quota is None:
+        quota = get_majority_quota(seats.sum())
+    banzhaf, shapley_shubik = power_indices_weights(seats, quota)
+    df_power["banzhaf"] = banzhaf
+    df_power["shapley_shubik"] = shapley_shubik
+    return df_power
+
+
+def power_indices_batch(
+    seats: np.ndarray, quota: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Función que calcula los índices de poder de una matriz de escenarios x partidos. Como
+    los índices sólo dependen del multiconjunto de escaños, cada fila se ordena y sólo se
+    resuelve una vez cada parlamento distinto.
+
+    Parameters
+    ----------
+    seats: np.ndarray
+        Matriz escenarios x partidos con los escaños de cada partido.
+    quota: Optional[int], default None
+        Escaños necesarios para ganar una votación. Por defecto la mayoría absoluta de
+        cada escenario.
+
+    Returns
+    -------
+    banzhaf: np.ndarray
+        Matriz escenarios x partidos con el índice de Banzhaf.
+    shapley_shubik: np.ndarray
+        Matriz escenarios x partidos con el índice de Shapley-Shubik.
+    """
+    seats = np.atleast_2d(np.asarray(seats, dtype=int))
+    order = np.argsort(-seats, axis=1, kind="stable")
+    sorted_seats = np.take_along_axis(seats, order, axis=1)
+    quotas = (
+        np.full(seats.shape[0], quota)
+        if quota is not None
+        else seats.sum(1) // 2 + 1  # Mayoría absoluta de cada escenario
+    )
+    unique_rows, inverse = np.unique(
+        np.column_stack((quotas, sorted_seats)), axis=0, return_inverse=True
+    )
+    inverse = inverse.reshape(-1)
+
+    banzhaf_unique = np.zeros((unique_rows.shape[0], seats.shape[1]))
+    shapley_unique = np.zeros((unique_rows.shape[0], seats.shape[1]))
+    for i, row in enumerate(unique_rows):
+        banzhaf_unique[i], shapley_unique[i] = power_indices_weights(row[1:], row[0])
+
+    banzhaf = np.zeros(seats.shape)
+    shapley_shubik = np.zeros(seats.shape)
+    np.put_along_axis(banzhaf, order, banzhaf_unique[inverse], axis=1)
+    np.put_along_axis(shapley_shubik, order, shapley_unique[inverse], axis=1)
+    return banzhaf, shapley_shubik
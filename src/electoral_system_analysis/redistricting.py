@@ -0,0 +1,271 @@
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from electoral_system_analysis.distribution_formulas import (
+    distributions_representative_matrix,
+    score_proportionality,
+    votes_to_matrix,
+)
+from electoral_system_analysis.distribution_regions import get_representative_by_regions
+
+DistrictKey = Tuple[Tuple[int, ...], int]
+
+
+class RedistrictingResult(NamedTuple):
+    """
+    Resultado de evaluar un mapa de circunscripciones.
+
+    grouping: pd.Series
+        Circunscripción asignada a cada reg_el_id.
+    df_districts: pd.DataFrame
+        Tabla con los miembros, el tamaño y los escaños de cada circunscripción.
+    df_rep: pd.DataFrame
+        Tabla con el reparto de escaños por partido.
+    score: float
+        Score de proporcionalidad del reparto.
+    n_reallocated: int
+        Número de circunscripciones que se han tenido que repartir de nuevo.
+    """
+
+    grouping: pd.Series
+    df_districts: pd.DataFrame
+    df_rep: pd.DataFrame
+    score: float
+    n_reallocated: int
+
+
+class RedistrictingExplorer:
+    """
+    Clase que evalúa mapas alternativos de circunscripciones. Un mapa es una agrupación de
+    los reg_el_id de la tabla de regiones; los votos de cada circunscripción se agregan
+    con un producto por la matriz de pertenencia, los escaños se reparten entre las
+    circunscripciones con get_representative_by_regions y sólo se reparten de nuevo entre
+    partidos las circunscripciones cuyos miembros o escaños no se han evaluado antes.
+
+    Parameters
+    ----------
+    formula_name: str
+        Nombre de la fórmula de cálculo del reparto entre partidos.
+    votes: pd.DataFrame
+        Tabla con los votos por partido y regiones.
+    regions: pd.DataFrame
+        Tabla con las columnas reg_el_id, size y type_reg.
+    n_representative: int
+        Número total de representantes
+    min_representative: int
+        Mínimo de representantes por circunscripción.
+    method: str, default "loreg"
+        Método de reparto de escaños entre circunscripciones.
+    electoral_barrier: float, default 0.0
+        Valor de la barrera electoral en cada circunscripción.
+    cache_size: int, default 4096
+        Número máximo de repartos de circunscripciones guardados.
+    """
+
+    def __init__(
+        self,
+        formula_name: str,
+        votes: pd.DataFrame,
+        regions: pd.DataFrame,
+        n_representative: int,
+        min_representative: int,
+        method: str = "loreg",
+        electoral_barrier: float = 0.0,
+        cache_size: int = 4096,
+    ):
+        self.formula_name = formula_name
+        self.regions = regions[["reg_el_id", "size", "type_reg"]].reset_index(drop=True)
+        self.votes_matrix, self.parties = votes_to_matrix(votes, self.regions)
+        self.n_representative = n_representative
+        self.min_representative = min_representative
+        self.method = method
+        self.electoral_barrier = electoral_barrier
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[DistrictKey, np.ndarray]" = OrderedDict()
+
+    def evaluate(self, grouping: pd.Series) -> RedistrictingResult:
+        """
+        Método que calcula el reparto de escaños de un mapa de circunscripciones.
+
+        Parameters
+        ----------
+        grouping: pd.Series
+            Serie indexada por reg_el_id con la circunscripción de cada región.
+
+        Returns
+        -------
+        result: RedistrictingResult
+            Resultado del mapa.
+        """
+        grouping = grouping.reindex(self.regions.reg_el_id.values)
+        if grouping.isna().any():
+            raise ValueError(
+                "Todas las regiones tienen que estar asignadas a una circunscripción."
+            )
+        codes, districts = pd.factorize(grouping, sort=True)
+        membership = np.zeros((districts.size, codes.size))
+        membership[codes, np.arange(codes.size)] = 1
+        district_votes = membership @ self.votes_matrix
+        df_districts = self._get_districts(codes, districts, membership)
+
+        keys = [
+            (members, n_rep) for members, n_rep in zip(df_districts.members, df_districts.n_rep)
+        ]
+        new_keys = list(OrderedDict.fromkeys(k for k in keys if k not in self._cache))
+        if new_keys:
+            position = {k: i for i, k in enumerate(keys)}
+            rows = [position[k] for k in new_keys]
+            new_rep = distributions_representative_matrix(
+                self.formula_name,
+                district_votes[rows],
+                df_districts.n_rep.values[rows],
+                self.electoral_barrier,
+            )
+            for key, rep in zip(new_keys, new_rep):
+                self._cache[key] = rep
+        district_rep = np.stack([self._cache[k] for k in keys])
+        for key in keys:
+            self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        df_rep = pd.DataFrame(
+            {
+                "party": self.parties,
+                "votes": self.votes_matrix.sum(0),
+                "n_rep": district_rep.sum(0),
+            }
+        )
+        df_rep = df_rep.sort_values("n_rep", ascending=False).reset_index(drop=True)
+        score = score_proportionality(df_rep.n_rep, df_rep.votes)
+        return RedistrictingResult(grouping, df_districts, df_rep, score, len(new_keys))
+
+    def _get_districts(
+        self, codes: np.ndarray, districts: pd.Index, membership: np.ndarray
+    ) -> pd.DataFrame:
+        """
+        Método que reparte los escaños entre las circunscripciones de un mapa. Una
+        circunscripción formada sólo por ciudades autónomas se mantiene como "caut".
+
+        Parameters
+        ----------
+        codes: np.ndarray
+            Índice de la circunscripción de cada región.
+        districts: pd.Index
+            Etiquetas de las circunscripciones.
+        membership: np.ndarray
+            Matriz circunscripciones x regiones de pertenencia.
+
+        Returns
+        -------
+        df_districts: pd.DataFrame
+            Tabla con las columnas district, members, size, type_reg y n_rep.
+        """
+        reg_el_id = self.regions.reg_el_id.values
+        is_prov = (self.regions.type_reg == "prov").values
+        df_districts = pd.DataFrame(
+            {
+                "reg_el_id": np.arange(districts.size),
+                "size": membership @ self.regions["size"].values,
+                "type_reg": np.where(membership @ is_prov > 0, "prov", "caut"),
+            }
+        )
+        df_districts = get_representative_by_regions(
+            df_districts, self.n_representative, self.min_representative, self.method
+        )
+        df_districts = df_districts.sort_values("reg_el_id").reset_index(drop=True)
+        order = np.argsort(codes, kind="stable")
+        members = np.split(reg_el_id[order], np.cumsum(np.bincount(codes))[:-1])
+        df_districts.insert(0, "district", districts)
+        df_districts.insert(1, "members", [tuple(sorted(m)) for m in members])
+        return df_districts.drop(columns="reg_el_id")
+
+
+def single_district_grouping(regions: pd.DataFrame) -> pd.Series:
+    """
+    Función que devuelve el mapa con una única circunscripción nacional.
+
+    Parameters
+    ----------
+    regions: pd.DataFrame
+        Tabla con la columna reg_el_id.
+
+    Returns
+    -------
+    grouping: pd.Series
+        Serie indexada por reg_el_id con la circunscripción de cada región.
+    """
+    return pd.Series(0, index=regions.reg_el_id.values)
+
+
+def propose_grouping(
+    grouping: pd.Series,
+    rng: np.random.Generator,
+    neighbours: Optional[Dict[int, Tuple[int, ...]]] = None,
+) -> pd.Series:
+    """
+    Función que genera un mapa candidato moviendo una región a la circunscripción de otra
+    región, que debe ser vecina si se indica la tabla de vecinos.
+
+    Parameters
+    ----------
+    grouping: pd.Series
+        Serie indexada por reg_el_id con la circunscripción de cada región.
+    rng: np.random.Generator
+        Generador de números aleatorios.
+    neighbours: Optional[Dict[int, Tuple[int, ...]]], default None
+        Diccionario con los reg_el_id vecinos de cada región.
+
+    Returns
+    -------
+    candidate: pd.Series
+        Mapa candidato.
+    """
+    candidate = grouping.copy()
+    region = rng.choice(candidate.index.values)
+    targets = candidate.index.values if neighbours is None else np.array(neighbours[region])
+    targets = targets[candidate.loc[targets].values != candidate.loc[region]]
+    if targets.size > 0:
+        candidate.loc[region] = candidate.loc[rng.choice(targets)]
+    return candidate
+
+
+def local_search_grouping(
+    explorer: RedistrictingExplorer,
+    grouping: pd.Series,
+    n_iterations: int,
+    seed: Optional[int] = None,
+    neighbours: Optional[Dict[int, Tuple[int, ...]]] = None,
+) -> RedistrictingResult:
+    """
+    Función que busca el mapa con mayor score de proporcionalidad aceptando los candidatos
+    de propose_grouping que mejoran el mejor mapa encontrado.
+
+    Parameters
+    ----------
+    explorer: RedistrictingExplorer
+        Explorador con los votos y las reglas del sistema.
+    grouping: pd.Series
+        Mapa inicial.
+    n_iterations: int
+        Número de candidatos a evaluar.
+    seed: Optional[int], default None
+        Semilla del generador de números aleatorios.
+    neighbours: Optional[Dict[int, Tuple[int, ...]]], default None
+        Diccionario con los reg_el_id vecinos de cada región.
+
+    Returns
+    -------
+    best: RedistrictingResult
+        Resultado del mejor mapa encontrado.
+    """
+    rng = np.random.default_rng(seed)
+    best = explorer.evaluate(grouping)
+    for _ in range(n_iterations):
+        candidate = explorer.evaluate(propose_grouping(best.grouping, rng, neighbours))
+        if candidate.score > best.score:
+            best = candidate
+    return best
@@ -0,0 +1,401 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class BallotTable(NamedTuple):
+    """
+    Papeletas ordenadas de una región agrupadas sin repetir.
+
+    ballots: np.ndarray
+        Matriz grupos x preferencias con la posición del candidato en cada preferencia,
+        -1 cuando la papeleta no tiene más preferencias.
+    weights: np.ndarray
+        Número de papeletas de cada grupo.
+    candidates: pd.Index
+        Candidatos asociados a las posiciones.
+    """
+
+    ballots: np.ndarray
+    weights: np.ndarray
+    candidates: pd.Index
+
+
+def _encode_rankings(rankings: pd.DataFrame, codes: Dict[str, int]) -> np.ndarray:
+    """
+    Función que convierte las etiquetas de los candidatos de cada preferencia en su
+    posición, añadiendo a codes los candidatos nuevos. Las preferencias vacías y los
+    candidatos repetidos en una papeleta se descartan.
+
+    Parameters
+    ----------
+    rankings: pd.DataFrame
+        Tabla con una papeleta por fila y una columna por preferencia.
+    codes: Dict[str, int]
+        Posición de cada candidato.
+
+    Returns
+    -------
+    ballots: np.ndarray
+        Matriz papeletas x preferencias con la posición de los candidatos.
+    """
+    labels, uniques = pd.factorize(rankings.values.reshape(-1))
+    for label in uniques:
+        label = str(label).strip()
+        if label != "" and label not in codes:
+            codes[label] = len(codes)
+    unique_codes = np.array([codes.get(str(label).strip(), -1) for label in uniques] + [-1])
+    ballots = unique_codes[labels].reshape(rankings.shape)
+
+    # Se quitan las repeticiones y se mueven las preferencias válidas al principio.
+    n_pref = ballots.shape[1]
+    repeated = (ballots[:, :, None] == ballots[:, None, :]) & np.tri(n_pref, k=-1, dtype=bool).T
+    ballots = np.where(repeated.any(1), -1, ballots)
+    order = np.argsort(ballots < 0, axis=1, kind="stable")
+    return np.take_along_axis(ballots, order, axis=1)
+
+
+def _group_ballots(ballots: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Función que agrupa las papeletas iguales sumando sus pesos.
+
+    Parameters
+    ----------
+    ballots: np.ndarray
+        Matriz papeletas x preferencias.
+    weights: np.ndarray
+        Peso de cada papeleta.
+
+    Returns
+    -------
+    ballots: np.ndarray
+        Matriz grupos x preferencias sin repeticiones.
+    weights: np.ndarray
+        Peso de cada grupo.
+    """
+    if ballots.shape[0] == 0:
+        return ballots, np.zeros(0)
+    base = int(ballots.max()) + 2
+    if ballots.shape[1] * np.log2(base) < 62:
+        # Cada papeleta se codifica en un entero que conserva el orden de las filas.
+        keys = (ballots + 1) @ (base ** np.arange(ballots.shape[1] - 1, -1, -1, dtype=np.int64))
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        ballots = ballots[first]
+    else:
+        ballots, inverse = np.unique(ballots, axis=0, return_inverse=True)
+    return ballots, np.bincount(inverse.reshape(-1), weights=weights)
+
+
+def _concat_ballots(parts: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Función que une varias tablas de papeletas completando con -1 las que tienen menos
+    preferencias.
+
+    Parameters
+    ----------
+    parts: List[Tuple[np.ndarray, np.ndarray]]
+        Papeletas y pesos de cada tabla.
+
+    Returns
+    -------
+    ballots: np.ndarray
+        Matriz papeletas x preferencias.
+    weights: np.ndarray
+        Peso de cada papeleta.
+    """
+    n_pref = max(ballots.shape[1] for ballots, _ in parts)
+    ballots = np.concatenate(
+        [np.pad(b, ((0, 0), (0, n_pref - b.shape[1])), constant_values=-1) for b, _ in parts]
+    )
+    return ballots, np.concatenate([weights for _, weights in parts])
+
+
+def _restrict_candidates(
+    ballots: np.ndarray, weights: np.ndarray, candidates: np.ndarray
+) -> BallotTable:
+    """
+    Función que crea la tabla de papeletas con los candidatos que aparecen en ellas.
+
+    Parameters
+    ----------
+    ballots: np.ndarray
+        Matriz grupos x preferencias.
+    weights: np.ndarray
+        Peso de cada grupo.
+    candidates: np.ndarray
+        Etiqueta de cada posición.
+
+    Returns
+    -------
+    ballot_table: BallotTable
+        Tabla de papeletas.
+    """
+    used = np.unique(ballots[ballots >= 0])
+    new_codes = np.full(len(candidates) + 1, -1)
+    new_codes[used] = np.arange(used.size)
+    return BallotTable(new_codes[ballots], weights, pd.Index(candidates[used]))
+
+
+def create_ballot_table(
+    rankings: pd.DataFrame, weights: Optional[pd.Series] = None
+) -> BallotTable:
+    """
+    Función que crea la tabla de papeletas agrupadas a partir de las papeletas ordenadas.
+
+    Parameters
+    ----------
+    rankings: pd.DataFrame
+        Tabla con una papeleta por fila y una columna por preferencia con la etiqueta del
+        candidato, vacía si no hay más preferencias.
+    weights: Optional[pd.Series], default None
+        Número de papeletas de cada fila. Por defecto 1.
+
+    Returns
+    -------
+    ballot_table: BallotTable
+        Tabla de papeletas.
+    """
+    codes: Dict[str, int] = {}
+    ballots = _encode_rankings(rankings, codes)
+    weights = np.ones(len(rankings)) if weights is None else np.asarray(weights, dtype=float)
+    ballots, weights = _group_ballots(ballots, weights)
+    return _restrict_candidates(ballots, weights, np.array(list(codes), dtype=object))
+
+
+def read_ballots(
+    path: str,
+    region_column: Optional[str] = "region",
+    count_column: Optional[str] = None,
+    chunksize: int = 100000,
+    sep: str = ",",
+) -> Dict[str, BallotTable]:
+    """
+    Función que lee un fichero de papeletas por bloques y las agrupa por región, de
+    manera que en memoria sólo se guarda un bloque y las papeletas distintas.
+
+    Parameters
+    ----------
+    path: str
+        Ruta del fichero con una papeleta por fila. El resto de columnas son las
+        preferencias en orden.
+    region_column: Optional[str], default "region"
+        Columna con la región de la papeleta. Si es None todas las papeletas son de la
+        región "".
+    count_column: Optional[str], default None
+        Columna con el número de papeletas de la fila. Por defecto 1.
+    chunksize: int, default 100000
+        Número de filas leídas en cada bloque.
+    sep: str, default ","
+        Separador del fichero.
+
+    Returns
+    -------
+    ballots: Dict[str, BallotTable]
+        Tabla de papeletas de cada región.
+    """
+    codes: Dict[str, int] = {}
+    groups: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    for chunk in pd.read_csv(path, sep=sep, chunksize=chunksize, dtype=str):
+        regions = chunk.pop(region_column) if region_column else pd.Series("", index=chunk.index)
+        if count_column:
+            weights = chunk.pop(count_column).astype(float).values
+        else:
+            weights = np.ones(len(chunk))
+        ballots = _encode_rankings(chunk, codes)
+        for region, rows in regions.groupby(regions, sort=False).indices.items():
+            if region in groups:
+                # Se vuelve a agrupar con lo acumulado para que la memoria no crezca con
+                # el número de bloques.
+                groups[region] = _group_ballots(
+                    *_concat_ballots([groups[region], (ballots[rows], weights[rows])])
+                )
+            else:
+                groups[region] = _group_ballots(ballots[rows], weights[rows])
+
+    candidates = np.array(list(codes), dtype=object)
+    result = {}
+    for region, (ballots, weights) in groups.items():
+        result[region] = _restrict_candidates(ballots, weights, candidates)
+    return result
+
+
+def stv_count(
+    ballot_table: BallotTable, n_seats: int, capacity: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Función que aplica el voto único transferible con cociente de Droop y transferencia
+    fraccionaria de Gregory sobre los grupos de papeletas. En cada ronda se eligen los
+    candidatos que alcanzan el cociente y se transfieren a la vez sus restos; si nadie lo
+    alcanza se elimina el candidato con menos votos (a igualdad, el de mayor posición).
+    Cuando los escaños que pueden recibir los candidatos en juego no superan los escaños
+    libres se eligen todos.
+
+    Un candidato puede tener capacidad para varios escaños, lo que permite contar listas
+    de partido: los votos se quedan en el partido mientras le queden escaños y sólo se
+    transfiere lo que sobra de los cocientes usados. Los escaños que le quedan a una lista
+    cuentan como candidatos sin votos, que se eliminan antes que cualquier otro.
+
+    Parameters
+    ----------
+    ballot_table: BallotTable
+        Tabla de papeletas.
+    n_seats: int
+        Número de escaños a repartir.
+    capacity: Optional[np.ndarray], default None
+        Número máximo de escaños de cada candidato. Por defecto 1.
+
+    Returns
+    -------
+    elected: np.ndarray
+        Escaños de cada candidato.
+    """
+    ballots = ballot_table.ballots
+    weights = ballot_table.weights.astype(float).copy()
+    n_candidates = len(ballot_table.candidates)
+    n_groups, n_pref = ballots.shape
+    if capacity is None:
+        capacity = np.ones(n_candidates, dtype=int)
+    capacity = np.array(capacity, dtype=int)
+    quota = 1 + weights.sum() // (n_seats + 1)
+    elected = np.zeros(n_candidates, dtype=int)
+    hopeful = capacity > 0
+    position = np.zeros(n_groups, dtype=int)
+    columns = np.arange(n_pref)
+    index = np.arange(n_candidates)
+
+    while elected.sum() < n_seats and hopeful.any():
+        # Cada grupo pasa a su primera preferencia en juego.
+        available = (ballots >= 0) & hopeful[ballots] & (columns >= position[:, None])
+        has_next = available.any(1)
+        position = np.where(has_next, available.argmax(1), n_pref)
+        holder = np.where(has_next, ballots[np.arange(n_groups), position % n_pref], 0)
+        tally = np.bincount(
+            holder[has_next], weights=weights[has_next], minlength=n_candidates
+        ).astype(float)
+
+        free_seats = n_seats - elected.sum()
+        slots = np.where(hopeful, capacity - elected, 0)
+        if slots.sum() <= free_seats:
+            new = slots
+        else:
+            reached = np.floor(tally / quota + 1e-9).astype(int)
+            new = np.where(hopeful, np.maximum(np.minimum(capacity, reached) - elected, 0), 0)
+            order = np.lexsort((index, -tally))
+            previous = np.cumsum(new[order]) - new[order]
+            new[order] = np.clip(free_seats - previous, 0, new[order])
+
+        # Los escaños sin votos de las listas son los primeros en eliminarse.
+        spare = np.where(hopeful, capacity - elected - 1, 0)[::-1]
+        excess = min(slots.sum() - free_seats, spare.sum())
+        if new.any():
+            elected += new
+            leaving = hopeful & (elected >= capacity)
+        elif excess > 0:
+            capacity = (
+                capacity - np.minimum(spare, excess - (np.cumsum(spare) - spare)).clip(0)[::-1]
+            )
+            continue
+        else:
+            rest = np.where(hopeful, tally - elected * quota, np.inf)
+            leaving = index == n_candidates - 1 - np.argmin(rest[::-1])
+
+        surplus = np.maximum(tally - elected * quota, 0)
+        factor = np.divide(surplus, tally, out=np.zeros(n_candidates), where=tally > 0)
+        transfer = has_next & leaving[holder]
+        weights[transfer] *= factor[holder[transfer]]
+        hopeful &= ~leaving
+    return elected
+
+
+def stv_rule(votes: pd.DataFrame, total_rep: int) -> pd.DataFrame:
+    """
+    Función que aplica el voto único transferible a los votos de partido, contando cada
+    voto como una papeleta que sólo ordena a su partido y cada partido como una lista
+    con capacidad para todos los escaños.
+
+    Parameters
+    ----------
+    votes: pd.DataFrame
+        Tabla con los votos por partido y regiones.
+
+    total_rep: int
+        Número total d eescaños a repartir.
+
+    Returns
+    -------
+    votes_rep: pd.DataFrame
+        Tabla de votos con la columna n_rep con los representantes repartidos.
+    """
+    votes_rep = votes.copy()
+    ballot_table = BallotTable(
+        np.arange(len(votes))[:, None], votes.votes.values, pd.Index(votes.party)
+    )
+    votes_rep["n_rep"] = stv_count(ballot_table, total_rep, np.full(len(votes), total_rep))
+    return votes_rep
+
+
+def _count_region(args: Tuple[BallotTable, int]) -> np.ndarray:
+    """
+    Función que cuenta una región en un proceso del pool.
+
+    Parameters
+    ----------
+    args: Tuple[BallotTable, int]
+        Tabla de papeletas y escaños de la región.
+
+    Returns
+    -------
+    elected: np.ndarray
+        Escaños de cada candidato.
+    """
+    return stv_count(*args)
+
+
+def stv_by_regions(
+    ballots: Dict[str, BallotTable], regions: pd.DataFrame, max_workers: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Función que aplica el voto único transferible a todas las regiones en paralelo.
+
+    Parameters
+    ----------
+    ballots: Dict[str, BallotTable]
+        Tabla de papeletas de cada región, por ejemplo la salida de read_ballots.
+    regions: pd.DataFrame
+        Tabla con el reparto de escaños por regiones.
+    max_workers: Optional[int], default None
+        Número de procesos. Con 1 las regiones se cuentan en el proceso actual.
+
+    Returns
+    -------
+    votes_rep: pd.DataFrame
+        Tabla con las columnas region, candidate, votes (primeras preferencias) y n_rep.
+    """
+    tasks = [(ballots[row.reg_el_id], row.n_rep) for row in regions.itertuples()]
+    if max_workers == 1:
+        results = list(map(_count_region, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_count_region, tasks))
+
+    tables = []
+    for (ballot_table, _), region, elected in zip(tasks, regions.reg_el_id, results):
+        first = ballot_table.ballots[:, 0]
+        votes = np.bincount(
+            first[first >= 0],
+            weights=ballot_table.weights[first >= 0],
+            minlength=len(ballot_table.candidates),
+        )
+        tables.append(
+            pd.DataFrame(
+                {
+                    "region": region,
+                    "candidate": ballot_table.candidates,
+                    "votes": votes,
+                    "n_rep": elected,
+                }
+            )
+        )
+    return pd.concat(tables, ignore_index=True)
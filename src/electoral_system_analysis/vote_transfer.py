@@ -0,0 +1,440 @@
+from typing import Callable, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from electoral_system_analysis.distribution_formulas import (
+    QUOTA_FORMULAS,
+    distributions_representative_matrix,
+    votes_to_matrix,
+)
+
+
+class VoteTransferResult(NamedTuple):
+    """
+    Resultado de la optimización de votos.
+
+    df_regions: pd.DataFrame
+        Tabla con las columnas region, n_rep, extra_votes y seats_gained de cada región.
+    seats_gained: int
+        Escaños ganados en total.
+    votes_used: int
+        Votos usados en total.
+    costs: pd.DataFrame
+        Tabla regiones x escaños ganados con los votos necesarios en cada región,
+        infinito si superan los votos disponibles.
+    """
+
+    df_regions: pd.DataFrame
+    seats_gained: int
+    votes_used: int
+    costs: pd.DataFrame
+
+
+def _get_party_rep(
+    formula_name: str,
+    votes: np.ndarray,
+    n_rep: np.ndarray,
+    party: int,
+    source: Optional[int],
+    extra: np.ndarray,
+    electoral_barrier: float,
+) -> np.ndarray:
+    """
+    Función que calcula los escaños del partido en cada fila tras sumarle extra votos,
+    quitándolos del partido source si se indica.
+
+    Parameters
+    ----------
+    formula_name: str
+        Nombre de la fórmula de cálculo del reparto.
+    votes: np.ndarray
+        Matriz filas x partidos con los votos.
+    n_rep: np.ndarray
+        Escaños de cada fila.
+    party: int
+        Columna del partido que recibe los votos.
+    source: Optional[int]
+        Columna del partido que pierde los votos. Si es None los votos son nuevos.
+    extra: np.ndarray
+        Votos que recibe el partido en cada fila.
+    electoral_barrier: float
+        Valor de la barrera electoral
+
+    Returns
+    -------
+    rep: np.ndarray
+        Escaños del partido en cada fila.
+    """
+    votes = votes.copy()
+    votes[:, party] += extra
+    if source is not None:
+        votes[:, source] -= extra
+    rep = distributions_representative_matrix(formula_name, votes, n_rep, electoral_barrier)
+    return rep[:, party]
+
+
+def _last_unchanged(changed: Callable[[np.ndarray], np.ndarray], low, high) -> np.ndarray:
+    """
+    Función que busca por bisección en cada fila el mayor valor de [low, high] en el que
+    todavía no se cumple changed, suponiendo que no se cumple en low y que una vez se
+    cumple se sigue cumpliendo.
+
+    Parameters
+    ----------
+    changed: Callable[[np.ndarray], np.ndarray]
+        Función que indica en cada fila si el valor ya cumple la condición.
+    low: np.ndarray
+        Menor valor de cada fila.
+    high: np.ndarray
+        Mayor valor de cada fila.
+
+    Returns
+    -------
+    last: np.ndarray
+        Mayor valor de cada fila que no cumple la condición.
+    """
+    low, high = low.copy(), high.copy()
+    while (high > low).any():
+        middle = (low + high + 1) // 2
+        achieved = changed(middle)
+        high = np.where(achieved, middle - 1, high)
+        low = np.where(achieved, low, middle)
+    return low
+
+
+def _get_quota_segments(
+    formula_name: str,
+    votes: np.ndarray,
+    n_rep: np.ndarray,
+    party: int,
+    target: np.ndarray,
+    high: np.ndarray,
+    electoral_barrier: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Función que divide los votos nuevos [0, high] de cada fila en tramos en los que no
+    cambian ni los partidos que superan la barrera ni el cociente. Dentro de un tramo los
+    escaños del partido crecen con sus votos, así que sólo puede perderlos al pasar de un
+    tramo al siguiente (paradoja de la población). Se descartan los votos en los que el
+    partido no puede llegar a target: con el cociente máximo del tramo se acotan los
+    escaños por restos y de ahí los escaños enteros que necesita, y como el cociente crece
+    con los votos se busca por punto fijo los votos mínimos para tenerlos.
+
+    Parameters
+    ----------
+    formula_name: str
+        Nombre de la fórmula de cociente.
+    votes: np.ndarray
+        Matriz filas x partidos con los votos.
+    n_rep: np.ndarray
+        Escaños de cada fila.
+    party: int
+        Columna del partido que recibe los votos.
+    target: np.ndarray
+        Escaños que tiene que alcanzar el partido en cada fila.
+    high: np.ndarray
+        Votos nuevos máximos de cada fila.
+    electoral_barrier: float
+        Valor de la barrera electoral
+
+    Returns
+    -------
+    rows: np.ndarray
+        Fila de cada tramo, ordenados por fila y votos.
+    starts: np.ndarray
+        Primeros votos nuevos de cada tramo.
+    ends: np.ndarray
+        Últimos votos nuevos de cada tramo.
+    """
+    quota = QUOTA_FORMULAS[formula_name]
+    n_rows, n_parties = votes.shape
+
+    def eligible(rows: np.ndarray, extra: np.ndarray) -> np.ndarray:
+        votes_rows = votes[rows].copy()
+        votes_rows[:, party] += extra
+        return votes_rows >= electoral_barrier * votes_rows.sum(1, keepdims=True)
+
+    # Cada partido entra o sale de la barrera como mucho una vez al sumar votos al partido.
+    rows = np.repeat(np.arange(n_rows), n_parties)
+    columns = np.tile(np.arange(n_parties), n_rows)
+    first = eligible(np.arange(n_rows), np.zeros(n_rows)).reshape(-1)
+    switch = first != eligible(np.arange(n_rows), high).reshape(-1)
+    rows, columns, first = rows[switch], columns[switch], first[switch]
+    switches = _last_unchanged(
+        lambda extra: eligible(rows, extra)[np.arange(rows.size), columns] != first,
+        np.zeros(rows.size, dtype=np.int64),
+        high[rows],
+    )
+    rows = np.concatenate([rows, np.arange(n_rows)])
+    ends = np.concatenate([switches, high])
+    order = np.lexsort((ends, rows))
+    rows, ends = rows[order], ends[order]
+    new_row = np.ones(rows.size, dtype=bool)
+    new_row[1:] = rows[1:] != rows[:-1]
+    keep = new_row.copy()
+    keep[1:] |= ends[1:] != ends[:-1]
+    rows, ends, new_row = rows[keep], ends[keep], new_row[keep]
+    starts = np.where(new_row, 0, np.roll(ends, 1) + 1)
+
+    # Votos de los demás partidos que superan la barrera en cada tramo.
+    mask = eligible(rows, starts)
+    others = np.where(mask, votes[rows], 0)
+    others[:, party] = 0
+    total = others.sum(1) + votes[rows, party]
+    n_eligible = mask.sum(1)
+    n_quota = np.maximum(n_rep[rows], 1)
+
+    def get_quota(segment: np.ndarray, extra: np.ndarray) -> np.ndarray:
+        return np.maximum(quota(total[segment] + extra, n_quota[segment]), 1)
+
+    # Escaños enteros mínimos: los restos dan como mucho ceil(restantes / partidos).
+    segment = np.flatnonzero(mask[:, party])
+    other_rep = (others[segment] // get_quota(segment, ends[segment])[:, None]).sum(1)
+    k = np.arange(int(target.max(initial=0)) + 1)
+    rest = n_rep[rows[segment], None] - k[None, :] - other_rep[:, None]
+    bound = k + np.maximum(1, -(-rest // n_eligible[segment, None]))
+    min_rep = np.argmax(bound >= target[rows[segment], None], axis=1)
+
+    low = starts[segment]
+    for _ in range(10000):
+        needed = min_rep * get_quota(segment, low) - votes[rows[segment], party]
+        new_low = np.maximum(low, np.minimum(needed, ends[segment] + 1)).astype(np.int64)
+        if (new_low == low).all():
+            break
+        low = new_low
+    keep = low <= ends[segment]
+    segment, low, min_rep = segment[keep], low[keep], min_rep[keep]
+
+    # Dentro de cada tramo de la barrera el cociente crece con los votos del partido.
+    first_quota = get_quota(segment, low)
+    n_quotas = (get_quota(segment, ends[segment]) - first_quota + 1).astype(np.int64)
+    index = np.repeat(np.arange(segment.size), n_quotas)
+    offset = np.arange(index.size) - np.repeat(np.cumsum(n_quotas) - n_quotas, n_quotas)
+    limit = first_quota[index] + offset
+    segment_ends = _last_unchanged(
+        lambda extra: get_quota(segment[index], extra) > limit,
+        low[index],
+        ends[segment[index]],
+    )
+    keep = np.ones(index.size, dtype=bool)
+    keep[1:] = (index[1:] != index[:-1]) | (segment_ends[1:] != segment_ends[:-1])
+    index, segment_ends = index[keep], segment_ends[keep]
+    segment_starts = np.where(
+        np.r_[True, index[1:] != index[:-1]], low[index], np.roll(segment_ends, 1) + 1
+    )
+    # Sólo hace falta repartir los tramos en los que la cota permite llegar a target.
+    party_rep = (votes[rows[segment[index]], party] + segment_ends) // get_quota(
+        segment[index], segment_ends
+    )
+    keep = party_rep >= min_rep[index]
+    index, segment_starts, segment_ends = index[keep], segment_starts[keep], segment_ends[keep]
+    return rows[segment[index]], segment_starts, segment_ends
+
+
+def get_seat_costs(
+    formula_name: str,
+    votes: np.ndarray,
+    n_rep: np.ndarray,
+    party: int,
+    source: Optional[int] = None,
+    electoral_barrier: float = 0.0,
+    max_votes: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Función que calcula en cada región los votos mínimos que necesita el partido para
+    ganar 1, 2, ... escaños más, sumando votos nuevos o moviéndolos desde el partido
+    source. Los votos de todas las regiones y escaños se buscan a la vez por bisección
+    sobre el reparto de distributions_representative_matrix, que es exacta cuando los
+    escaños del partido crecen con sus votos: en las fórmulas de divisores y al mover
+    votos entre partidos. En las fórmulas de cociente con votos nuevos puede aparecer la
+    paradoja de la población, así que los votos se dividen en tramos con el mismo
+    cociente y los mismos partidos por encima de la barrera, se busca el primer tramo en
+    el que se alcanza el escaño y la bisección se hace dentro de él.
+
+    Parameters
+    ----------
+    formula_name: str
+        Nombre de la fórmula de cálculo del reparto.
+    votes: np.ndarray
+        Matriz regiones x partidos con los votos.
+    n_rep: np.ndarray
+        Escaños de cada región.
+    party: int
+        Columna del partido que recibe los votos.
+    source: Optional[int], default None
+        Columna del partido que pierde los votos. Si es None los votos son nuevos.
+    electoral_barrier: float, default 0.0
+        Valor de la barrera electoral
+    max_votes: Optional[int], default None
+        Votos máximos a considerar. Los escaños que cuestan más se dejan en infinito, lo
+        que acota la búsqueda en las fórmulas de cociente.
+
+    Returns
+    -------
+    costs: np.ndarray
+        Matriz regiones x (escaños + 1) con los votos necesarios para ganar cada número
+        de escaños, infinito si no se pueden ganar.
+    """
+    votes = np.asarray(votes, dtype=float)
+    n_rep = np.asarray(n_rep, dtype=int)
+    current = distributions_representative_matrix(formula_name, votes, n_rep, electoral_barrier)
+    current = current[:, party]
+    max_gain = n_rep - current
+    costs = np.full((votes.shape[0], int(n_rep.max(initial=0)) + 1), np.inf)
+    costs[:, 0] = 0
+
+    region = np.repeat(np.arange(votes.shape[0]), max_gain)
+    gain = np.arange(region.size) - np.repeat(np.cumsum(max_gain) - max_gain, max_gain) + 1
+    if region.size == 0:
+        return costs
+    if source is None:
+        high = 4 * n_rep[region] * (votes[region].sum(1) + 1)
+    else:
+        high = votes[region, source].astype(int)
+    if max_votes is not None:
+        high = np.minimum(high, max_votes)
+    low = np.zeros(region.size, dtype=np.int64)
+    high = high.astype(np.int64)
+
+    def reaches(rows: np.ndarray, extra: np.ndarray) -> np.ndarray:
+        rep = _get_party_rep(
+            formula_name,
+            votes[region[rows]],
+            n_rep[region[rows]],
+            party,
+            source,
+            extra,
+            electoral_barrier,
+        )
+        return rep >= current[region[rows]] + gain[rows]
+
+    def bisect(entries: np.ndarray, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+        while (high - low > 1).any():
+            middle = (low + high) // 2
+            achieved = reaches(entries, middle)
+            high = np.where(achieved, middle, high)
+            low = np.where(achieved, low, middle)
+        return high
+
+    entries = np.arange(region.size)
+    possible = reaches(entries, high)
+    high = bisect(entries, low, high)
+    if source is None and formula_name in QUOTA_FORMULAS:
+        # La bisección da unos votos que alcanzan el escaño, pero puede haber otros
+        # menores en un tramo anterior. El mínimo está en el primer tramo cuyo final
+        # alcanza el escaño y dentro de él la bisección es exacta.
+        entries = np.flatnonzero(possible)
+        rows, starts, ends = _get_quota_segments(
+            formula_name,
+            votes[region[entries]],
+            n_rep[region[entries]],
+            party,
+            current[region[entries]] + gain[entries],
+            high[entries],
+            electoral_barrier,
+        )
+        # Los tramos se comprueban en orden por ventanas crecientes hasta encontrar el
+        # primero de cada fila que alcanza el escaño.
+        position = np.arange(rows.size) - np.searchsorted(rows, rows)
+        first = np.full(entries.size, -1)
+        checked, window = 0, 256
+        while (first < 0).any():
+            candidates = np.flatnonzero(
+                (first[rows] < 0) & (position >= checked) & (position < checked + window)
+            )
+            achieved = candidates[reaches(entries[rows[candidates]], ends[candidates])]
+            found, index = np.unique(rows[achieved], return_index=True)
+            first[found] = achieved[index]
+            checked, window = checked + window, 2 * window
+        high[entries] = bisect(entries, starts[first] - 1, ends[first])
+    costs[region, gain] = np.where(possible, high, np.inf)
+    return costs
+
+
+def optimize_vote_transfer(
+    formula_name: str,
+    votes: pd.DataFrame,
+    regions: pd.DataFrame,
+    party: str,
+    budget: int,
+    source: Optional[str] = None,
+    electoral_barrier: float = 0.0,
+) -> VoteTransferResult:
+    """
+    Función que busca dónde colocar un número de votos, nuevos o movidos desde el partido
+    source, para que party gane el máximo número de escaños. Con el coste de cada escaño
+    adicional en cada región se resuelve una mochila de elección múltiple por
+    programación dinámica sobre los escaños ganados, que es exacta aunque los costes
+    marginales no sean crecientes.
+
+    Parameters
+    ----------
+    formula_name: str
+        Nombre de la fórmula de cálculo del reparto.
+    votes: pd.DataFrame
+        Tabla con los votos por partido y regiones.
+    regions: pd.DataFrame
+        Tabla con el reparto de escaños por regiones.
+    party: str
+        Partido que recibe los votos.
+    budget: int
+        Número de votos disponibles.
+    source: Optional[str], default None
+        Partido que pierde los votos. Si es None los votos son nuevos.
+    electoral_barrier: float, default 0.0
+        Valor de la barrera electoral
+
+    Returns
+    -------
+    result: VoteTransferResult
+        Reparto óptimo de los votos.
+    """
+    votes_matrix, parties = votes_to_matrix(votes, regions)
+    n_rep = regions.n_rep.values.astype(int)
+    costs = get_seat_costs(
+        formula_name,
+        votes_matrix,
+        n_rep,
+        parties.get_loc(party),
+        None if source is None else parties.get_loc(source),
+        electoral_barrier,
+        budget,
+    )
+
+    # best[g]: votos mínimos para ganar g escaños con las regiones ya procesadas.
+    n_regions, n_options = costs.shape
+    max_seats = (n_options - 1) * n_regions
+    best = np.full(max_seats + 1, np.inf)
+    best[0] = 0
+    choices = np.zeros((n_regions, max_seats + 1), dtype=int)
+    for r in range(n_regions):
+        candidates = np.full((max_seats + 1, n_options), np.inf)
+        for g in range(n_options):
+            candidates[g:, g] = best[: max_seats + 1 - g] + costs[r, g]
+        choices[r] = candidates.argmin(1)
+        best = candidates.min(1)
+
+    seats_gained = int(np.flatnonzero(best <= budget).max())
+    gains = np.zeros(n_regions, dtype=int)
+    remaining = seats_gained
+    for r in range(n_regions - 1, -1, -1):
+        gains[r] = choices[r, remaining]
+        remaining -= gains[r]
+    extra_votes = costs[np.arange(n_regions), gains].astype(int)
+
+    current = distributions_representative_matrix(
+        formula_name, votes_matrix, n_rep, electoral_barrier
+    )[:, parties.get_loc(party)]
+    df_regions = pd.DataFrame(
+        {
+            "region": regions.reg_el_id.values,
+            "n_rep": current,
+            "extra_votes": extra_votes,
+            "seats_gained": gains,
+        }
+    )
+    df_costs = pd.DataFrame(costs, index=regions.reg_el_id.values)
+    df_costs.index.name = "region"
+    df_costs.columns.name = "seats_gained"
+    return VoteTransferResult(df_regions, seats_gained, int(extra_votes.sum()), df_costs)
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from electoral_system_analysis.clean_electoral_data import read_ine_electors
+
+SAMPLE_59755 = (
+    "\ufeffProvincias;Tipo de elector;Total\r\n"
+    "TOTAL;Electores españoles residentes en España;35.141.198\r\n"
+    "TOTAL;Electores españoles residentes en el extranjero;2.328.260\r\n"
+    "TOTAL;Total;37.469.458\r\n"
+    "Albacete;Electores españoles residentes en España;299.924\r\n"
+    "Albacete;Electores españoles residentes en el extranjero;8.064\r\n"
+    "Albacete;Total;307.988\r\n"
+    "Alicante / Alacant;Electores españoles residentes en España;1.261.010\r\n"
+    "Alicante / Alacant;Electores españoles residentes en el extranjero;45.301\r\n"
+    "Alicante / Alacant;Total;1.306.311\r\n"
+    "Ceuta;Electores españoles residentes en España;63.117\r\n"
+    "Ceuta;Electores españoles residentes en el extranjero;1.046\r\n"
+    "Ceuta;Total;64.163\r\n"
+)
+
+SAMPLE_PERIODS = (
+    "\ufeffProvincias;Tipo de elector;Periodo;Total\r\n"
+    "TOTAL;Total;2023M07;37.469.458\r\n"
+    "TOTAL;Total;2019M11;37.001.379\r\n"
+    "Albacete;Total;2023M07;307.988\r\n"
+    "Albacete;Total;2019M11;309.542\r\n"
+)
+
+
+def write_sample(tmp_path, content):
+    path = tmp_path / "59755.csv"
+    path.write_bytes(content.encode("utf-8"))
+    return str(path)
+
+
+def test_read_ine_electors(tmp_path):
+    df_census = read_ine_electors(write_sample(tmp_path, SAMPLE_59755))
+    assert list(df_census.columns) == ["name", "codename", "size"]
+    assert df_census.name.tolist() == ["Albacete", "Alicante / Alacant", "Ceuta"]
+    assert df_census.codename.tolist() == ["albacete", "alicante_alacant", "ceuta"]
+    assert df_census["size"].tolist() == [307988, 1306311, 64163]
+    assert pd.api.types.is_integer_dtype(df_census["size"])
+
+
+@pytest.mark.parametrize(
+    "elector_type, sizes",
+    [
+        ("Electores españoles residentes en España", [299924, 1261010, 63117]),
+        ("Electores españoles residentes en el extranjero", [8064, 45301, 1046]),
+    ],
+)
+def test_read_ine_electors_type(tmp_path, elector_type, sizes):
+    df_census = read_ine_electors(write_sample(tmp_path, SAMPLE_59755), elector_type)
+    assert df_census["size"].tolist() == sizes
+
+
+def test_read_ine_electors_year(tmp_path):
+    df_census = read_ine_electors(write_sample(tmp_path, SAMPLE_PERIODS))
+    assert list(df_census.columns) == ["year", "name", "codename", "size"]
+    assert df_census.year.tolist() == [2023, 2019]
+    assert df_census["size"].tolist() == [307988, 309542]
+    assert (df_census.codename == "albacete").all()
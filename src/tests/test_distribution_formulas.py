@@ -5,7 +5,9 @@ import pytest
 from electoral_system_analysis.distribution_formulas import (
     FormulaDosntExist,
     distributions_representative_by_regions,
+    distributions_representative_matrix,
     get_distribution_formula,
+    votes_to_matrix,
 )
 
 
@@ -102,3 +104,54 @@ def test_distributions_representative_by_regions(
 def test_electoral_barrier_error(df_votes, df_regions):
     with pytest.raises(RuntimeError):
         _ = distributions_representative_by_regions("hare", df_votes, df_regions, 0.8)
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        "hare",
+        "dhondt",
+        "imperiali",
+        "droop",
+        "hagenbach",
+        "sainte_lague",
+        "sainte_lague_modificado",
+    ],
+)
+def test_distributions_representative_matrix(df_votes, df_regions, method):
+    votes_matrix, parties = votes_to_matrix(df_votes, df_regions)
+    result = distributions_representative_matrix(method, votes_matrix, df_regions.n_rep.values)
+    formula = get_distribution_formula(method)
+    for i, reg_row in df_regions.iterrows():
+        expected = formula(df_votes[df_votes.region == reg_row["reg_el_id"]], reg_row["n_rep"])
+        expected = expected.set_index("party").loc[parties, "n_rep"].values
+        assert (result[i] == expected).all()
+
+
+@pytest.mark.parametrize("electoral_barrier", [0.0, 0.08])
+def test_distributions_representative_matrix_barrier(df_votes, df_regions, electoral_barrier):
+    votes_matrix, parties = votes_to_matrix(df_votes, df_regions)
+    result = distributions_representative_matrix(
+        "hare", np.stack((votes_matrix, votes_matrix)), df_regions.n_rep.values, electoral_barrier
+    )
+    expected = distributions_representative_by_regions(
+        "hare", df_votes, df_regions, electoral_barrier
+    ).set_index("party")
+    assert (result[0].sum(0) == expected.loc[parties, "n_rep"].values).all()
+    assert (result[0] == result[1]).all()
+
+
+def test_distributions_representative_matrix_errors(df_votes, df_regions):
+    votes_matrix, _ = votes_to_matrix(df_votes, df_regions)
+    with pytest.raises(FormulaDosntExist):
+        distributions_representative_matrix("fake_method", votes_matrix, df_regions.n_rep.values)
+    with pytest.raises(RuntimeError):
+        distributions_representative_matrix("hare", votes_matrix, df_regions.n_rep.values, 0.8)
+
+
+def test_distributions_representative_matrix_quota_barrier():
+    result = distributions_representative_matrix("droop", np.array([[7, 6, 1, 1]]), 10, 0.1)
+    assert result[0].tolist() == [5, 5, 0, 0]
+    for method in ["hare", "droop", "hagenbach"]:
+        result = distributions_representative_matrix(method, np.array([[70, 60, 10, 1]]), 3, 0.1)
+        assert result[0].tolist() == [2, 1, 0, 0]
@@ -2,7 +2,11 @@ import numpy as np
 import pandas as pd
 import pytest
 
-from electoral_system_analysis.distribution_regions import get_representative_by_regions
+from electoral_system_analysis.distribution_regions import (
+    get_representative_by_regions,
+    get_representative_by_regions_series,
+    get_seat_changes,
+)
 
 
 @pytest.fixture
@@ -58,3 +62,43 @@ def test_get_representative_by_regions(
     )
     result = result.sort_values("reg_el_id").reset_index(drop=True)
     assert (result.n_rep.values == expected).all()
+
+
+@pytest.mark.parametrize(
+    "method, n_representative, min_representative",
+    [("loreg", 139, 2), ("loreg", 200, 1), ("dhondt", 20, 1), ("hare", 50, 2), ("hare", 50, 0)],
+)
+def test_get_representative_by_regions_series(
+    df_regions, method, n_representative, min_representative
+):
+    rng = np.random.default_rng(0)
+    growth = rng.uniform(0.9, 1.1, (6, df_regions.shape[0]))
+    df_census = pd.DataFrame(
+        (df_regions["size"].values * growth).astype(int),
+        index=range(2000, 2006),
+        columns=df_regions.reg_el_id,
+    )
+    type_reg = df_regions.set_index("reg_el_id").type_reg
+    result = get_representative_by_regions_series(
+        df_census, n_representative, min_representative, method, type_reg
+    )
+    for year, sizes in df_census.iterrows():
+        df_year = df_regions.assign(size=sizes.values)
+        expected = get_representative_by_regions(
+            df_year, n_representative, min_representative, method
+        )
+        expected = expected.sort_values("reg_el_id").n_rep.values
+        assert (result.loc[year].values == expected).all()
+        assert "n_rep" not in df_year.columns
+    assert (result.sum(1) == n_representative).all()
+
+
+def test_get_seat_changes():
+    df_seats = pd.DataFrame(
+        {"reg_0": [5, 5, 6, 6], "reg_1": [3, 3, 2, 3]}, index=[2000, 2001, 2002, 2003]
+    )
+    result = get_seat_changes(df_seats)
+    assert result.year.tolist() == [2002, 2002, 2003]
+    assert result.region.tolist() == ["reg_0", "reg_1", "reg_1"]
+    assert result.n_rep.tolist() == [6, 2, 3]
+    assert result.change.tolist() == [1, -1, 1]
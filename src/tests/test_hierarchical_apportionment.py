@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from electoral_system_analysis.distribution_formulas import distributions_representative_by_regions
+from electoral_system_analysis.distribution_regions import get_representative_by_regions
+from electoral_system_analysis.hierarchical_apportionment import HierarchicalApportionment
+
+
+@pytest.fixture
+def df_tree() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "node": ["spain", "com_a", "com_b", "reg_0", "reg_1", "reg_2", "reg_3", "reg_4"],
+            "parent": [None, "spain", "spain", "com_a", "com_a", "com_b", "com_b", "spain"],
+            "size": [np.nan, np.nan, np.nan, 5274869, 4068343, 2017012, 1529713, 63301],
+            "min_rep": [0, 0, 0, 2, 2, 2, 2, 1],
+            "type_reg": ["prov", "prov", "prov", "prov", "prov", "prov", "prov", "caut"],
+        }
+    )
+
+
+@pytest.fixture
+def df_votes() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "party": np.tile(["party_a", "party_b", "party_c", "party_d"], 5),
+            "votes": rng.integers(1000, 100000, 20),
+            "region": np.repeat(["reg_0", "reg_1", "reg_2", "reg_3", "reg_4"], 4),
+        }
+    )
+
+
+def test_single_level_matches_flat(df_votes):
+    df_regions = pd.DataFrame(
+        {
+            "reg_el_id": ["reg_0", "reg_1", "reg_2", "reg_3", "reg_4"],
+            "size": [5274869, 4068343, 2017012, 1529713, 63301],
+            "type_reg": ["prov", "prov", "prov", "prov", "caut"],
+        }
+    )
+    tree = pd.DataFrame(
+        {
+            "node": ["spain"] + df_regions.reg_el_id.tolist(),
+            "parent": [None] + ["spain"] * 5,
+            "size": [np.nan] + df_regions["size"].tolist(),
+            "min_rep": [0, 2, 2, 2, 2, 1],
+            "type_reg": ["prov"] + df_regions.type_reg.tolist(),
+        }
+    )
+    result = HierarchicalApportionment("dhondt").run(tree, df_votes, 40)
+
+    regions = get_representative_by_regions(df_regions, 40, 2, "loreg")
+    nodes = result.df_nodes.set_index("node")
+    assert (nodes.loc[regions.reg_el_id, "n_rep"].values == regions.n_rep.values).all()
+    expected = distributions_representative_by_regions("dhondt", df_votes, regions, 0.0)
+    rep = result.df_rep.set_index("party").loc[expected.party]
+    assert (rep.n_rep.values == expected.n_rep.values).all()
+
+
+def test_nested_levels_and_cache(df_tree, df_votes):
+    engine = HierarchicalApportionment("dhondt")
+    result = engine.run(df_tree, df_votes, 40)
+    nodes = result.df_nodes.set_index("node").n_rep
+    assert nodes["spain"] == 40
+    assert nodes["com_a"] + nodes["com_b"] + nodes["reg_4"] == 40
+    assert nodes["reg_0"] + nodes["reg_1"] == nodes["com_a"]
+    assert nodes["reg_4"] == 1
+    assert result.votes_rep.n_rep.sum() == 40
+    assert result.n_computed == 8
+
+    assert engine.run(df_tree, df_votes, 40).n_computed == 0
+
+    changed = df_votes.copy()
+    changed.loc[changed.region == "reg_2", "votes"] += 1000
+    result_changed = engine.run(df_tree, changed, 40)
+    assert result_changed.n_computed == 3
+    fresh = HierarchicalApportionment("dhondt").run(df_tree, changed, 40)
+    assert (result_changed.votes_rep.n_rep == fresh.votes_rep.n_rep).all()
+
+
+def test_barrier_at_upper_level(df_tree, df_votes):
+    votes = df_votes.copy()
+    votes.loc[votes.party == "party_d", "votes"] = 10
+    votes.loc[(votes.party == "party_d") & (votes.region == "reg_3"), "votes"] = 40000
+    tree = df_tree.assign(electoral_barrier=[0.1, 0, 0, 0, 0, 0, 0, 0])
+    result = HierarchicalApportionment("dhondt").run(tree, votes, 40)
+    assert result.df_rep.set_index("party").n_rep["party_d"] == 0
+    result = HierarchicalApportionment("dhondt").run(df_tree, votes, 40)
+    assert result.df_rep.set_index("party").n_rep["party_d"] > 0
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from electoral_system_analysis.distribution_formulas import (
+    distributions_representative_by_regions,
+    score_proportionality,
+)
+from electoral_system_analysis.distribution_regions import get_representative_by_regions
+from electoral_system_analysis.inverse_design import (
+    ForwardEvaluator,
+    search_barrier,
+    search_chamber_size,
+    search_first,
+    search_min_representative,
+)
+
+
+@pytest.fixture
+def evaluator() -> ForwardEvaluator:
+    rng = np.random.default_rng(3)
+    df_regions = pd.DataFrame(
+        {
+            "reg_el_id": [0, 1, 2, 3, 4, 5],
+            "size": [5274869, 4068343, 2017012, 1529713, 989733, 63301],
+            "type_reg": ["prov", "prov", "prov", "prov", "prov", "caut"],
+        }
+    )
+    df_votes = pd.DataFrame(
+        {
+            "party": np.tile(["party_a", "party_b", "party_c", "party_d", "party_e"], 6),
+            "votes": rng.integers(1000, 100000, 30),
+            "region": np.repeat(np.arange(6), 5),
+        }
+    )
+    return ForwardEvaluator("dhondt", df_votes, df_regions)
+
+
+def test_forward_evaluator_score(evaluator):
+    df_regions = get_representative_by_regions(evaluator.regions.copy(), 30, 2)
+    df_votes = pd.DataFrame(
+        {
+            "party": np.tile(evaluator.parties, 6),
+            "votes": evaluator.votes_matrix.reshape(-1),
+            "region": np.repeat(np.arange(6), 5),
+        }
+    )
+    df_rep = distributions_representative_by_regions("dhondt", df_votes, df_regions, 0.05)
+    assert evaluator.score(30, 2, 0.05) == pytest.approx(
+        score_proportionality(df_rep.n_rep, df_rep.votes)
+    )
+    assert evaluator.n_evaluations == 1
+    evaluator.score(30, 2, 0.05)
+    assert evaluator.n_evaluations == 1
+
+
+@pytest.mark.parametrize("monotone", [False, True])
+def test_search_first(monotone):
+    value, score, scores = search_first(list(range(100)), lambda x: x / 100, 0.42, monotone)
+    assert value == 42 and score == 0.42
+    assert len(scores) < 10 if monotone else len(scores) == 43
+
+
+def test_search_chamber_size(evaluator):
+    scores = [evaluator.score(n, 1, 0.0) for n in range(20, 81)]
+    target = np.median(scores)
+    result = search_chamber_size(evaluator, target, 20, 80, 1)
+    assert result.value == 20 + np.flatnonzero(np.array(scores) >= target)[0]
+    assert result.score >= target
+
+
+@pytest.mark.parametrize("monotone", [False, True])
+def test_search_min_representative(evaluator, monotone):
+    scores = np.array([evaluator.score(50, m, 0.0) for m in range(10)])
+    target = scores[7]
+    expected = np.flatnonzero(scores >= target).max()
+    assert expected < 9
+    result = search_min_representative(evaluator, target, 50, 9, monotone=monotone)
+    assert result.value == expected
+    assert result.score == pytest.approx(scores[expected])
+    assert len(result.scores) < 5 if monotone else len(result.scores) == 10 - expected
+
+
+def test_search_barrier(evaluator):
+    grid = np.linspace(0, 0.2, 201)
+    scores = np.array([evaluator.score(40, 1, b) for b in grid])
+    target = scores[100]
+    result = search_barrier(evaluator, target, 40, 1)
+    assert result.score >= target
+    assert result.value >= grid[scores >= target].max()
+    assert evaluator.score(40, 1, result.value) >= target
+
+
+def test_search_barrier_above_last_share():
+    df_votes = pd.DataFrame(
+        {
+            "region": np.repeat(["reg_0", "reg_1"], 3),
+            "party": ["a", "b", "c"] * 2,
+            "votes": [50, 45, 5] * 2,
+        }
+    )
+    df_regions = pd.DataFrame(
+        {"reg_el_id": ["reg_0", "reg_1"], "size": [1000, 1000], "type_reg": ["prov", "prov"]}
+    )
+    evaluator = ForwardEvaluator("dhondt", df_votes, df_regions)
+    assert evaluator.barrier_breakpoints(0.3).tolist() == [0.0, 0.05, 0.3]
+    target = evaluator.score(10, 1, 0.0)
+    assert evaluator.score(10, 1, 0.3) == target
+    for monotone in [False, True]:
+        result = search_barrier(evaluator, target, 10, 1, max_barrier=0.3, monotone=monotone)
+        assert result.value == 0.3
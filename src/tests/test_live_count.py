@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from electoral_system_analysis.distribution_formulas import (
+    distributions_representative_by_regions,
+    score_proportionality,
+)
+from electoral_system_analysis.live_count import LiveCount, replay_snapshots
+
+
+@pytest.fixture
+def df_regions() -> pd.DataFrame:
+    return pd.DataFrame({"reg_el_id": [f"reg_{i}" for i in range(6)], "n_rep": [7, 5, 3, 9, 2, 4]})
+
+
+@pytest.fixture
+def snapshots(df_regions) -> list:
+    rng = np.random.default_rng(2)
+    parties = ["party_a", "party_b", "party_c", "party_d"]
+    totals = pd.DataFrame(
+        {
+            "region": np.repeat(df_regions.reg_el_id, len(parties)),
+            "party": parties * len(df_regions),
+            "votes": rng.integers(1000, 50000, len(df_regions) * len(parties)),
+        }
+    )
+    result = []
+    counted = np.zeros(len(totals))
+    for step in range(1, 5):
+        regions = rng.choice(df_regions.reg_el_id, 2, replace=False)
+        rows = totals.region.isin(regions).values
+        counted[rows] = np.minimum(1, counted[rows] + 0.5)
+        result.append(totals[rows].assign(votes=(totals.votes[rows] * counted[rows]).round()))
+    result.append(totals)
+    return result
+
+
+def test_live_count_matches_full_count(df_regions, snapshots):
+    live_count = LiveCount("dhondt", df_regions, 0.03)
+    current = pd.DataFrame(columns=["region", "party", "votes"])
+    for snapshot in snapshots:
+        updated = live_count.update(snapshot, replace=True)
+        previous = current.set_index(["region", "party"]).votes
+        new = snapshot.set_index(["region", "party"]).votes
+        changed = new.ne(previous.reindex(new.index)).groupby(level="region").any()
+        assert sorted(updated) == sorted(changed.index[changed])
+        current = pd.concat([current, snapshot]).drop_duplicates(["region", "party"], keep="last")
+
+        counted = df_regions[df_regions.reg_el_id.isin(current.region)]
+        expected = distributions_representative_by_regions("dhondt", current, counted, 0.03)
+        result = live_count.df_rep.set_index("party").loc[expected.party]
+        assert (result.n_rep.values == expected.n_rep.values).all()
+        assert np.allclose(result.votes.values, expected.votes.values)
+        assert live_count.score() == pytest.approx(
+            score_proportionality(expected.n_rep, expected.votes)
+        )
+
+
+def test_update_with_increments(df_regions):
+    live_count = LiveCount("sainte_lague", df_regions)
+    deltas = pd.DataFrame(
+        {"region": ["reg_0", "reg_0"], "party": ["party_a", "party_b"], "votes": [600, 400]}
+    )
+    live_count.update(deltas)
+    live_count.update(deltas.assign(party=["party_c", "party_a"]))
+    assert live_count.df_rep.set_index("party").votes.to_dict() == {
+        "party_a": 1000,
+        "party_b": 400,
+        "party_c": 600,
+    }
+    assert live_count.df_rep.n_rep.sum() == 7
+    with pytest.raises(ValueError):
+        live_count.update(deltas.assign(region="reg_9"))
+
+
+def test_update_empty_deltas(df_regions, snapshots, tmp_path):
+    live_count = LiveCount("dhondt", df_regions, 0.03)
+    empty = pd.DataFrame(columns=["region", "party", "votes"])
+    assert live_count.update(empty).size == 0
+    assert live_count.df_rep.empty
+
+    paths = [str(tmp_path / "snapshot_0.csv"), str(tmp_path / "snapshot_1.csv")]
+    empty.to_csv(paths[0], index=False)
+    snapshots[0].to_csv(paths[1], index=False)
+    result = replay_snapshots(live_count, paths)
+    assert result.df_snapshots.n_updated.tolist() == [0, 2]
+    assert live_count.update(empty).size == 0
+    assert live_count.party_rep.sum() > 0
+
+
+def test_replay_snapshots(df_regions, snapshots, tmp_path):
+    paths = []
+    for i, snapshot in enumerate(snapshots):
+        path = tmp_path / f"snapshot_{i}.csv"
+        snapshot.to_csv(path, index=False)
+        paths.append(str(path))
+    result = replay_snapshots(LiveCount("dhondt", df_regions, 0.03), paths)
+    assert result.df_snapshots.snapshot.tolist() == [f"snapshot_{i}" for i in range(5)]
+    assert result.df_snapshots.n_updated.tolist() == [2, 2, 1, 2, 4]
+    final = result.df_rep[result.df_rep.snapshot == "snapshot_4"]
+    assert final.n_rep.sum() == df_regions.n_rep.sum()
+
+
+def test_replay_cumulative_snapshots(df_regions, snapshots, tmp_path):
+    paths = []
+    current = pd.DataFrame(columns=["region", "party", "votes"])
+    for i, snapshot in enumerate(snapshots[:4]):
+        current = pd.concat([current, snapshot]).drop_duplicates(["region", "party"], keep="last")
+        path = tmp_path / f"snapshot_{i}.csv"
+        current.to_csv(path, index=False)
+        paths.append(str(path))
+    # El último avance se repite sin cambios.
+    paths.append(paths[-1])
+    live_count = LiveCount("dhondt", df_regions, 0.03)
+    result = replay_snapshots(live_count, paths)
+    n_regions = [pd.read_csv(path).region.nunique() for path in paths]
+    assert n_regions[-1] > 2
+    assert (result.df_snapshots.n_updated <= 2).all()
+    assert result.df_snapshots.n_updated.iloc[-1] == 0
+    expected = distributions_representative_by_regions(
+        "dhondt", current, df_regions[df_regions.reg_el_id.isin(current.region)], 0.03
+    )
+    result = live_count.df_rep.set_index("party").loc[expected.party]
+    assert (result.n_rep.values == expected.n_rep.values).all()
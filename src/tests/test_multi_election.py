@@ -0,0 +1,163 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from electoral_system_analysis.distribution_formulas import (
+    distributions_representative_by_regions,
+    score_proportionality,
+)
+from electoral_system_analysis.multi_election import (
+    REGION_ALIASES,
+    create_vote_tensor,
+    distributions_representative_tensor,
+    get_tensor_rep,
+    score_proportionality_tensor,
+)
+from electoral_system_analysis.party_index import create_party_index
+
+PATH_DATA = os.path.join(os.path.dirname(__file__), "..", "..", "electoral_data", "clean_data")
+
+
+@pytest.fixture
+def elections():
+    election_2019 = pd.DataFrame(
+        {
+            "codename": ["almeria", "almeria", "almeria", "cadiz", "cadiz", "cadiz"],
+            "political_parties": ["PSOE", "PP", "VOX", "PSOE", "PP", "VOX"],
+            "votes": [89295, 74000, 51000, 188271, 120000, 90000],
+        }
+    )
+    election_2023 = pd.DataFrame(
+        {
+            "Circunscription": ["Almería", "Almería", "Cádiz", "Cádiz", "Cádiz", "Ceuta"],
+            "Partidos": ["P.P.", "PSOE", "PP", "PSOE", "SUMAR", "PP"],
+            "Votos": [120000, 80000, 200000, 180000, 60000, 15000],
+        }
+    )
+    return election_2019, election_2023
+
+
+def test_create_vote_tensor(elections):
+    election_2019, election_2023 = elections
+    vote_tensor = create_vote_tensor(
+        {
+            "2019": election_2019.rename(
+                columns={"codename": "region", "political_parties": "party"}
+            ),
+            "2023": election_2023.rename(
+                columns={"Circunscription": "region", "Partidos": "party", "Votos": "votes"}
+            ),
+        },
+        regions=["almeria", "cadiz"],
+    )
+    assert vote_tensor.votes.shape == (2, 2, 5)
+    assert vote_tensor.regions.tolist() == ["almeria", "cadiz"]
+    assert vote_tensor.parties.tolist() == ["p_p_", "pp", "psoe", "sumar", "vox"]
+    assert vote_tensor.votes[0].sum() == election_2019.votes.sum()
+    assert vote_tensor.votes[1].sum() == election_2023.Votos[:5].sum()
+
+
+def test_create_vote_tensor_missing_regions(elections):
+    election_2019, election_2023 = elections
+    with pytest.raises(ValueError, match="ceuta"):
+        create_vote_tensor(
+            {
+                "2019": election_2019.rename(
+                    columns={"codename": "region", "political_parties": "party"}
+                ),
+                "2023": election_2023.rename(
+                    columns={"Circunscription": "region", "Partidos": "party", "Votos": "votes"}
+                ),
+            }
+        )
+
+
+def test_create_vote_tensor_region_aliases():
+    election_2019 = pd.DataFrame(
+        {
+            "region": ["Alicante / Alacant", "Castellón / Castelló", "Girona"],
+            "party": ["PP", "PP", "PP"],
+            "votes": [100, 200, 300],
+        }
+    )
+    election_2023 = pd.DataFrame(
+        {
+            "region": ["Alacant/Alicante", "Castelló/Castellón", "Gerona"],
+            "party": ["PP", "PP", "PP"],
+            "votes": [10, 20, 30],
+        }
+    )
+    elections = {"2019": election_2019, "2023": election_2023}
+    with pytest.raises(ValueError, match="gerona"):
+        create_vote_tensor(elections)
+
+    vote_tensor = create_vote_tensor(
+        elections, region_aliases=dict(REGION_ALIASES, Gerona="Girona")
+    )
+    assert vote_tensor.regions.tolist() == ["alicante_alacant", "castellon_castello", "girona"]
+    assert vote_tensor.votes[:, :, 0].tolist() == [[100, 200, 300], [10, 20, 30]]
+
+
+def test_create_vote_tensor_real_data():
+    election_2019 = pd.read_csv(os.path.join(PATH_DATA, "2019_noviembre", "clean_data_votes.csv"))
+    election_2023 = pd.read_csv(os.path.join(PATH_DATA, "2023_julio", "pre_clean_congreso.csv"))
+    region_table = pd.read_csv(os.path.join(PATH_DATA, "2019_noviembre", "region_table_2019.csv"))
+    vote_tensor = create_vote_tensor(
+        {
+            "2019": election_2019.rename(
+                columns={"codename": "region", "political_parties": "party"}
+            ),
+            "2023": election_2023.rename(columns={"party_initialis": "party"}),
+        },
+        regions=region_table.codename,
+    )
+    assert vote_tensor.regions.size == 52
+    assert vote_tensor.votes[0].sum() == election_2019.votes.sum()
+    assert vote_tensor.votes[1].sum() == election_2023.votes.sum()
+
+
+def test_create_vote_tensor_party_index(elections):
+    election_2019, election_2023 = elections
+    party_index = create_party_index(
+        pd.DataFrame(
+            {
+                "id": [1, 2, 3],
+                "name": ["PARTIDO SOCIALISTA OBRERO ESPAÑOL", "PARTIDO POPULAR", "VOX"],
+                "initialis": ["PSOE", "PP", "VOX"],
+            }
+        )
+    )
+    vote_tensor = create_vote_tensor(
+        {
+            "2019": election_2019.rename(columns={"codename": "region"}),
+            "2023": election_2023.rename(
+                columns={"Circunscription": "region", "Partidos": "political_parties"}
+            ).rename(columns={"Votos": "votes"}),
+        },
+        party_column="political_parties",
+        party_index=party_index,
+        regions=["almeria", "cadiz"],
+    )
+    assert vote_tensor.parties.tolist() == ["p_p_", "party_1", "party_2", "party_3", "sumar"]
+    assert (vote_tensor.votes[:, :, 1] > 0).all()
+
+
+def test_distributions_representative_tensor(elections):
+    election_2019, _ = elections
+    votes = election_2019.rename(columns={"codename": "region", "political_parties": "party"})
+    votes["party"] = votes.party.str.lower()
+    scaled = votes.assign(votes=votes.votes * np.array([1, 2, 3, 3, 2, 1]))
+    vote_tensor = create_vote_tensor({"a": votes, "b": scaled})
+    n_rep = pd.Series([6, 9], index=["almeria", "cadiz"])
+    rep = distributions_representative_tensor("dhondt", vote_tensor, n_rep, 0.03)
+    df_rep = get_tensor_rep(vote_tensor, rep)
+    scores = score_proportionality_tensor(vote_tensor, rep)
+
+    regions = pd.DataFrame({"reg_el_id": ["almeria", "cadiz"], "n_rep": [6, 9]})
+    for name, data in [("a", votes), ("b", scaled)]:
+        expected = distributions_representative_by_regions("dhondt", data, regions, 0.03)
+        result = df_rep[df_rep.election == name].set_index("party").loc[expected.party]
+        assert (result.n_rep.values == expected.n_rep.values).all()
+        assert scores[name] == pytest.approx(score_proportionality(expected.n_rep, expected.votes))
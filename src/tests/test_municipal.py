@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from electoral_system_analysis.distribution_formulas import distributions_representative_matrix
+from electoral_system_analysis.municipal import (
+    distributions_representative_municipal,
+    get_council_size,
+)
+
+
+@pytest.fixture
+def df_municipal():
+    rng = np.random.default_rng(0)
+    n_municipalities = 300
+    population = (10 ** rng.uniform(1.5, 6, n_municipalities)).astype(int)
+    n_lists = rng.integers(1, 8, n_municipalities)
+    municipality = np.repeat(np.arange(n_municipalities), n_lists)
+    votes = pd.DataFrame(
+        {
+            "municipality": municipality,
+            "party": [f"party_{i}" for i in np.concatenate([np.arange(n) for n in n_lists])],
+            "votes": rng.integers(1, 1000, municipality.size)
+            * (1 + population[municipality] // 500),
+        }
+    )
+    municipalities = pd.DataFrame(
+        {"municipality": np.arange(n_municipalities), "population": population}
+    )
+    return votes.sample(frac=1, random_state=0), municipalities
+
+
+@pytest.mark.parametrize(
+    "population, expected",
+    [
+        ([50, 100, 101, 250, 251], [3, 3, 5, 5, 7]),
+        ([1000, 1001, 2001, 5001, 10001, 20001, 50001], [7, 9, 11, 13, 17, 21, 25]),
+        ([100001, 200000, 200001, 3223334], [27, 27, 27, 57]),
+    ],
+)
+def test_get_council_size(population, expected):
+    assert (get_council_size(np.array(population)) == expected).all()
+
+
+@pytest.mark.parametrize("method", ["dhondt", "sainte_lague", "hare", "droop"])
+def test_distributions_representative_municipal(df_municipal, method):
+    votes, municipalities = df_municipal
+    votes_rep, df_rep = distributions_representative_municipal(
+        method, votes, municipalities, 0.05, chunk_size=70
+    )
+    seats = get_council_size(municipalities.population.values)
+    for municipality, votes_mun in votes_rep.groupby("municipality"):
+        expected = distributions_representative_matrix(
+            method, votes_mun.votes.values, seats[municipality], 0.05
+        )
+        assert (votes_mun.n_rep.values == expected).all()
+    assert df_rep.n_rep.sum() == votes_rep.n_rep.sum()
+    assert df_rep.votes.sum() == votes.votes.sum()
+
+
+def test_distributions_representative_municipal_quota_barrier():
+    votes = pd.DataFrame({"municipality": 0, "party": ["a", "b", "c", "d"], "votes": [5, 4, 1, 1]})
+    municipalities = pd.DataFrame({"municipality": [0], "population": [1000]})
+    votes_rep, _ = distributions_representative_municipal("droop", votes, municipalities, 0.1)
+    assert votes_rep.set_index("party").n_rep.loc[["a", "b", "c", "d"]].tolist() == [4, 3, 0, 0]
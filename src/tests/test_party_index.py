@@ -0,0 +1,97 @@
+import os
+
+import pandas as pd
+import pytest
+
+from electoral_system_analysis.party_index import (
+    create_party_index,
+    get_ngrams,
+    map_party_ids,
+    read_party_index,
+)
+
+PATH_PARTIES = os.path.join(
+    os.path.dirname(__file__), "..", "..", "electoral_data", "raw_data", "2019_noviembre"
+)
+
+
+@pytest.fixture
+def party_index():
+    df_parties = pd.DataFrame(
+        {
+            "id": [1, 2, 4, 8, 21],
+            "name": [
+                "PARTIDO SOCIALISTA OBRERO ESPAÑOL",
+                "PARTIDO POPULAR",
+                "UNIDAS PODEMOS",
+                "EN COMÚ PODEM-GUANYEM EL CANVI",
+                "MÁS PAÍS",
+            ],
+            "initialis": ["PSOE", "PP", "PODEMOS-IU", "ECP-GUANYEM EL CANVI", "MÁS PAÍS"],
+        }
+    )
+    df_coalitions = pd.DataFrame(
+        {"id": [1, 2], "name": ["UNIDAS PODEMOS", "MÁS PAÍS"], "initialis": ["UP", "MÁS PAÍS"]}
+    )
+    df_relations = pd.DataFrame(
+        {"id": [1, 2, 3], "coalition_id": [1, 1, 2], "political_party_id": [4, 8, 21]}
+    )
+    return create_party_index(df_parties, df_coalitions, df_relations)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("psoe", ["pso", "soe"]), ("pp", ["pp"]), ("vox", ["vox"])],
+)
+def test_get_ngrams(value, expected):
+    assert get_ngrams(value) == expected
+
+
+def test_party_index_keys(party_index):
+    keys = party_index.keys.set_index("key")
+    assert keys.loc["maspais", "party_id"] == 21
+    assert keys.loc["maspais", "coalition_id"] == 2
+    assert keys.loc["up", "coalition_id"] == 1
+    assert pd.isna(keys.loc["up", "party_id"])
+    assert not party_index.keys.key.duplicated().any()
+
+
+def test_map_party_ids(party_index):
+    data = pd.DataFrame(
+        {
+            "region": ["madrid", "madrid", "barcelona", "barcelona", "madrid"],
+            "party": ["PSOE", "Partido Popular ", "ECP-GUANYEM", "UP", "XYZ"],
+            "votes": [10, 20, 30, 40, 50],
+        }
+    )
+    result = map_party_ids(data, "party", party_index)
+    assert result.party_id.tolist()[:3] == [1, 2, 8]
+    assert pd.isna(result.party_id[3]) and result.coalition_id[3] == 1
+    assert pd.isna(result.party_id[4]) and result.match_score[4] == 0
+    assert result.match_score[1] == 1 and 0.65 <= result.match_score[2] < 1
+    assert (result.votes == data.votes).all()
+
+
+def test_map_party_ids_real_data():
+    party_index = read_party_index(
+        os.path.join(PATH_PARTIES, "bbdd_partidos.csv"),
+        os.path.join(PATH_PARTIES, "bbdd_coaliciones.csv"),
+        os.path.join(PATH_PARTIES, "bbdd_coaliciones_relaciones.csv"),
+    )
+    data = pd.DataFrame(
+        {
+            "party": [
+                "PSOE",
+                "ESCAÑOSEN BLANCO",
+                "RECORTESCERO",
+                "AHORACANARIAS-PCPC",
+                "ADELANTEANDALUCÍA",
+                "PCTC",
+                "SUMAR -COMPROMÍS",
+            ]
+        }
+    )
+    result = map_party_ids(data, "party", party_index)
+    assert result.party_id[:4].tolist() == [1, 33, 22, 43]
+    assert result.party_id[4:].isna().all()
+    assert result.coalition_id[4:].isna().all()
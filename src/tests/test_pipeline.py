@@ -0,0 +1,98 @@
+import csv
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from electoral_system_analysis.pipeline import PipelineStep, run_pipeline
+
+
+def write_upper(source: str, target: str) -> None:
+    data = pd.read_csv(source)
+    data["name"] = data.name.str.upper()
+    data.to_csv(target, index=False)
+
+
+def write_total(sources: list, target: str) -> None:
+    data = pd.concat([pd.read_csv(source) for source in sources])
+    data[["votes"]].sum().to_frame("total").to_csv(target, index=False)
+
+
+@pytest.fixture
+def steps(tmp_path):
+    raw_a, raw_b = str(tmp_path / "raw" / "a.csv"), str(tmp_path / "raw" / "b.csv")
+    os.makedirs(tmp_path / "raw")
+    pd.DataFrame({"name": ["psoe", "pp"], "votes": [10, 20]}).to_csv(raw_a, index=False)
+    pd.DataFrame({"name": ["vox"], "votes": [5]}).to_csv(raw_b, index=False)
+    clean_a, clean_b = str(tmp_path / "clean" / "a.csv"), str(tmp_path / "clean" / "b.csv")
+    total = str(tmp_path / "clean" / "total.csv")
+    return [
+        PipelineStep(
+            "total",
+            write_total,
+            (clean_a, clean_b),
+            (total,),
+            {"sources": [clean_a, clean_b], "target": total},
+        ),
+        PipelineStep(
+            "clean_a", write_upper, (raw_a,), (clean_a,), {"source": raw_a, "target": clean_a}
+        ),
+        PipelineStep(
+            "clean_b", write_upper, (raw_b,), (clean_b,), {"source": raw_b, "target": clean_b}
+        ),
+    ]
+
+
+def test_run_pipeline(steps, tmp_path):
+    manifest = str(tmp_path / "manifest.json")
+    summary = run_pipeline(steps, manifest, max_workers=2, verbose=False)
+    assert summary.step.tolist()[-1] == "total"
+    assert (summary.status == "run").all()
+    assert pd.read_csv(tmp_path / "clean" / "total.csv").total[0] == 35
+
+    summary = run_pipeline(steps, manifest, max_workers=2, verbose=False)
+    assert (summary.status == "skipped").all()
+
+    # Cambiar el formato de b sin cambiar su limpieza no repite total.
+    raw_b = tmp_path / "raw" / "b.csv"
+    pd.read_csv(raw_b).to_csv(raw_b, index=False, quoting=csv.QUOTE_ALL)
+    summary = run_pipeline(steps, manifest, max_workers=2, verbose=False).set_index("step")
+    assert summary.status.to_dict() == {"clean_a": "skipped", "clean_b": "run", "total": "skipped"}
+
+    pd.DataFrame({"name": ["psoe"], "votes": [1]}).to_csv(tmp_path / "raw" / "a.csv", index=False)
+    os.remove(tmp_path / "clean" / "b.csv")
+    summary = run_pipeline(steps, manifest, max_workers=2, verbose=False)
+    assert (summary.status == "run").all()
+    assert pd.read_csv(tmp_path / "clean" / "total.csv").total[0] == 6
+
+
+def test_run_pipeline_cycle(tmp_path):
+    path_a, path_b = str(tmp_path / "a.csv"), str(tmp_path / "b.csv")
+    cycle = [
+        PipelineStep(
+            "step_a", write_upper, (path_b,), (path_a,), {"source": path_b, "target": path_a}
+        ),
+        PipelineStep(
+            "step_b", write_upper, (path_a,), (path_b,), {"source": path_a, "target": path_b}
+        ),
+    ]
+    with pytest.raises(RuntimeError):
+        run_pipeline(cycle, str(tmp_path / "manifest.json"), verbose=False)
+
+
+def test_run_pipeline_missing_inputs(steps, tmp_path, capsys):
+    manifest = str(tmp_path / "manifest.json")
+    os.remove(tmp_path / "raw" / "a.csv")
+    with pytest.raises(FileNotFoundError, match="clean_a"):
+        run_pipeline(steps, manifest, max_workers=2)
+    output = capsys.readouterr().out
+    assert "missing" in output and "failed" in output
+    assert os.path.exists(tmp_path / "clean" / "b.csv")
+    assert not os.path.exists(tmp_path / "clean" / "total.csv")
+    with open(manifest) as file:
+        assert list(json.load(file)) == ["clean_b"]
+
+    pd.DataFrame({"name": ["psoe"], "votes": [1]}).to_csv(tmp_path / "raw" / "a.csv", index=False)
+    summary = run_pipeline(steps, manifest, max_workers=2, verbose=False).set_index("step")
+    assert summary.status.to_dict() == {"clean_a": "run", "clean_b": "skipped", "total": "run"}
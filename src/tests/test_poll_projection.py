@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from electoral_system_analysis.distribution_formulas import distributions_representative_by_regions
+from electoral_system_analysis.poll_projection import project_polls, project_seats
+
+
+@pytest.fixture
+def df_regions() -> pd.DataFrame:
+    return pd.DataFrame({"reg_el_id": ["reg_0", "reg_1", "reg_2"], "n_rep": [10, 6, 4]})
+
+
+@pytest.fixture
+def df_votes() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "region": np.repeat(["reg_0", "reg_1", "reg_2"], 4),
+            "party": ["party_a", "party_b", "party_c", "party_d"] * 3,
+            "votes": [
+                40000,
+                35000,
+                15000,
+                10000,
+                20000,
+                25000,
+                2000,
+                13000,
+                9000,
+                6000,
+                4000,
+                1000,
+            ],
+        }
+    )
+
+
+@pytest.mark.parametrize("method", ["uniform", "proportional", "hybrid"])
+def test_baseline_poll_keeps_election(df_votes, df_regions, method):
+    national = df_votes.groupby("party").votes.sum()
+    polls = (national / national.sum()).to_frame("baseline").T
+    vote_tensor = project_polls(polls, df_votes, df_regions, method)
+    expected = df_votes.pivot(index="region", columns="party", values="votes")
+    assert np.allclose(vote_tensor.votes[0], expected.values)
+
+    seats = project_seats("dhondt", polls, df_votes, df_regions, method)
+    expected = distributions_representative_by_regions("dhondt", df_votes, df_regions, 0.0)
+    assert (seats.loc["baseline", expected.party].values == expected.n_rep.values).all()
+
+
+def test_swing_methods(df_votes, df_regions):
+    polls = pd.DataFrame(
+        {"party_a": [0.30, 0.50], "party_b": [0.40, 0.30], "party_c": [0.20, 0.05]},
+        index=["poll_0", "poll_1"],
+    )
+    uniform = project_polls(polls, df_votes, df_regions, "uniform")
+    proportional = project_polls(polls, df_votes, df_regions, "proportional")
+    hybrid = project_polls(polls, df_votes, df_regions, "hybrid", 0.25)
+    region_votes = df_votes.groupby("region").votes.sum().values
+    for vote_tensor in [uniform, proportional, hybrid]:
+        assert vote_tensor.votes.shape == (2, 3, 4)
+        assert np.allclose(vote_tensor.votes.sum(2), region_votes)
+        assert (vote_tensor.votes >= 0).all()
+
+    # Uniforme: party_c pierde en poll_1 más de lo que tiene en reg_1.
+    assert uniform.votes[1, 1, 2] == 0
+    base = df_votes.pivot(index="region", columns="party", values="votes").values
+    ratio = proportional.votes[0] / base
+    assert np.allclose(ratio[:, :3] / ratio[:, [0]], (ratio[0, :3] / ratio[0, 0])[None, :])
+
+    seats = project_seats("sainte_lague", polls, df_votes, df_regions, "hybrid", 0.25, 0.03)
+    for poll in polls.index:
+        projected = pd.DataFrame(
+            {
+                "region": np.repeat(hybrid.regions, 4),
+                "party": np.tile(hybrid.parties, 3),
+                "votes": hybrid.votes[polls.index.get_loc(poll)].reshape(-1),
+            }
+        )
+        expected = distributions_representative_by_regions(
+            "sainte_lague", projected, df_regions, 0.03
+        )
+        assert (seats.loc[poll, expected.party].values == expected.n_rep.values).all()
+
+    with pytest.raises(ValueError):
+        project_polls(polls, df_votes, df_regions, "cube")
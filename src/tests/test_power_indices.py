@@ -0,0 +1,66 @@
+from itertools import combinations, permutations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from electoral_system_analysis.power_indices import (
+    get_majority_quota,
+    power_indices,
+    power_indices_batch,
+    power_indices_weights,
+)
+
+
+def brute_force_indices(seats, quota):
+    n_parties = len(seats)
+    swings = np.zeros(n_parties)
+    for size in range(n_parties + 1):
+        for coalition in combinations(range(n_parties), size):
+            weight = sum(seats[i] for i in coalition)
+            for i in range(n_parties):
+                if i not in coalition and weight < quota <= weight + seats[i]:
+                    swings[i] += 1
+    pivots = np.zeros(n_parties)
+    orders = list(permutations(range(n_parties)))
+    for order in orders:
+        weight = 0
+        for i in order:
+            weight += seats[i]
+            if weight >= quota:
+                pivots[i] += 1
+                break
+    return swings / swings.sum(), pivots / len(orders)
+
+
+@pytest.mark.parametrize(
+    "seats, quota",
+    [
+        ([50, 49, 1], 51),
+        ([4, 3, 2, 1], 6),
+        ([7, 3, 3, 2, 0, 1], 9),
+        ([10, 4, 4, 4, 3, 2, 1], 15),
+    ],
+)
+def test_power_indices_weights(seats, quota):
+    banzhaf, shapley_shubik = power_indices_weights(np.array(seats), quota)
+    expected_banzhaf, expected_shapley = brute_force_indices(seats, quota)
+    assert np.allclose(banzhaf, expected_banzhaf)
+    assert np.allclose(shapley_shubik, expected_shapley)
+
+
+def test_power_indices_df_rep():
+    df_rep = pd.DataFrame({"party": ["a", "b", "c"], "votes": [10, 9, 1], "n_rep": [50, 49, 1]})
+    result = power_indices(df_rep)
+    assert get_majority_quota(100) == 51
+    assert np.allclose(result.banzhaf, [0.6, 0.2, 0.2])
+    assert np.allclose(result.shapley_shubik, [2 / 3, 1 / 6, 1 / 6])
+
+
+def test_power_indices_batch():
+    seats = np.array([[50, 49, 1], [1, 49, 50], [50, 49, 1], [40, 40, 20]])
+    banzhaf, shapley_shubik = power_indices_batch(seats)
+    for row, banzhaf_row, shapley_row in zip(seats, banzhaf, shapley_shubik):
+        expected_banzhaf, expected_shapley = power_indices_weights(row, row.sum() // 2 + 1)
+        assert np.allclose(banzhaf_row, expected_banzhaf)
+        assert np.allclose(shapley_row, expected_shapley)
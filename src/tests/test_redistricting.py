@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from electoral_system_analysis.distribution_formulas import distributions_representative_by_regions
+from electoral_system_analysis.distribution_regions import get_representative_by_regions
+from electoral_system_analysis.redistricting import (
+    RedistrictingExplorer,
+    local_search_grouping,
+    single_district_grouping,
+)
+
+
+@pytest.fixture
+def df_regions() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "reg_el_id": [0, 1, 2, 3, 4],
+            "size": [5274869, 4068343, 2017012, 1529713, 63301],
+            "type_reg": ["prov", "prov", "prov", "prov", "caut"],
+        }
+    )
+
+
+@pytest.fixture
+def df_votes() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "party": np.tile(["party_a", "party_b", "party_c", "party_d"], 5),
+            "votes": rng.integers(1000, 100000, 20),
+            "region": np.repeat([0, 1, 2, 3, 4], 4),
+        }
+    )
+
+
+def test_explorer_identity_grouping(df_votes, df_regions):
+    explorer = RedistrictingExplorer("dhondt", df_votes, df_regions, 40, 2)
+    result = explorer.evaluate(pd.Series([0, 1, 2, 3, 4], index=df_regions.reg_el_id))
+    regions = get_representative_by_regions(df_regions.copy(), 40, 2, "loreg")
+    expected = distributions_representative_by_regions("dhondt", df_votes, regions, 0.0)
+    expected = expected.set_index("party").loc[result.df_rep.party]
+    assert (result.df_rep.n_rep.values == expected.n_rep.values).all()
+    assert result.df_districts.n_rep.sum() == 40
+    assert result.n_reallocated == 5
+
+
+def test_explorer_incremental(df_votes, df_regions):
+    explorer = RedistrictingExplorer("dhondt", df_votes, df_regions, 40, 2, method="dhondt")
+    explorer.evaluate(pd.Series([0, 1, 2, 3, 4], index=df_regions.reg_el_id))
+    result = explorer.evaluate(pd.Series([0, 1, 2, 3, 4], index=df_regions.reg_el_id))
+    assert result.n_reallocated == 0
+
+    result = explorer.evaluate(single_district_grouping(df_regions))
+    assert result.df_districts.members[0] == (0, 1, 2, 3, 4)
+    assert result.df_districts.type_reg[0] == "prov"
+    assert result.df_districts.n_rep[0] == 40
+
+
+def test_local_search_grouping(df_votes, df_regions):
+    explorer = RedistrictingExplorer("dhondt", df_votes, df_regions, 40, 2)
+    grouping = pd.Series([0, 1, 2, 3, 4], index=df_regions.reg_el_id)
+    initial = explorer.evaluate(grouping)
+    best = local_search_grouping(explorer, grouping, 50, seed=1)
+    assert best.score >= initial.score
+    assert best.df_rep.n_rep.sum() == 40
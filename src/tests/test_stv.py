@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from electoral_system_analysis.distribution_formulas import (
+    distributions_representative_by_regions,
+    distributions_representative_matrix,
+    droop_coefficient,
+)
+from electoral_system_analysis.stv import (
+    create_ballot_table,
+    read_ballots,
+    stv_by_regions,
+    stv_count,
+    stv_rule,
+)
+
+
+@pytest.fixture
+def df_rankings() -> pd.DataFrame:
+    groups = [
+        (4, ["oranges", None]),
+        (2, ["pears", "oranges"]),
+        (8, ["chocolate", "strawberries"]),
+        (4, ["chocolate", "sweets"]),
+        (1, ["strawberries", None]),
+        (1, ["sweets", None]),
+    ]
+    rows = [ranking for count, ranking in groups for _ in range(count)]
+    return pd.DataFrame(rows, columns=["rank_1", "rank_2"])
+
+
+def test_stv_count(df_rankings):
+    ballot_table = create_ballot_table(df_rankings)
+    assert ballot_table.ballots.shape[0] == 6
+    assert ballot_table.weights.sum() == 20
+    elected = pd.Series(stv_count(ballot_table, 3), index=ballot_table.candidates)
+    assert sorted(elected[elected > 0].index) == ["chocolate", "oranges", "strawberries"]
+
+
+def test_stv_rule_plumped_votes_is_droop():
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        votes = pd.DataFrame(
+            {"party": [f"party_{i}" for i in range(6)], "votes": rng.integers(100, 100000, 6)}
+        )
+        n_rep = int(rng.integers(1, 15))
+        expected = droop_coefficient(votes, n_rep).set_index("party").n_rep
+        result = stv_rule(votes, n_rep).set_index("party").n_rep
+        assert (result == expected.loc[result.index]).all()
+
+    regions = pd.DataFrame({"reg_el_id": ["reg_0", "reg_1"], "n_rep": [5, 8]})
+    votes = pd.DataFrame(
+        {
+            "party": ["party_a", "party_b", "party_c"] * 2,
+            "votes": [51000, 32000, 17000, 40000, 39000, 21000],
+            "region": np.repeat(["reg_0", "reg_1"], 3),
+        }
+    )
+    result = distributions_representative_by_regions("stv", votes, regions, 0.0)
+    expected = distributions_representative_by_regions("droop", votes, regions, 0.0)
+    assert (result.set_index("party").n_rep == expected.set_index("party").n_rep).all()
+
+
+def test_stv_matrix_is_droop():
+    rng = np.random.default_rng(1)
+    votes = rng.integers(0, 10000, (50, 6)).astype(float)
+    n_rep = rng.integers(1, 15, 50)
+    rep = distributions_representative_matrix("stv", votes, n_rep, 0.05)
+    assert (rep == distributions_representative_matrix("droop", votes, n_rep, 0.05)).all()
+    for row in range(10):
+        df_votes = pd.DataFrame({"party": list("abcdef"), "votes": votes[row]})
+        expected = stv_rule(df_votes, n_rep[row]).n_rep.values
+        result = distributions_representative_matrix("stv", votes[[row]], n_rep[[row]])[0]
+        assert (result == expected).all()
+
+
+def test_read_ballots_and_parallel_count(df_rankings, tmp_path):
+    data = pd.concat(
+        [df_rankings.assign(region="reg_0"), df_rankings.iloc[::-1].assign(region="reg_1")]
+    )
+    data.loc[data.region == "reg_1", "rank_2"] = "pears"
+    path = tmp_path / "ballots.csv"
+    data.to_csv(path, index=False)
+
+    ballots = read_ballots(path, chunksize=7)
+    assert sorted(ballots) == ["reg_0", "reg_1"]
+    for region, ballot_table in ballots.items():
+        expected = create_ballot_table(data[data.region == region].drop(columns="region"))
+        assert ballot_table.weights.sum() == 20
+        assert ballot_table.ballots.shape[0] == expected.ballots.shape[0]
+        assert sorted(ballot_table.candidates) == sorted(expected.candidates)
+
+    regions = pd.DataFrame({"reg_el_id": ["reg_0", "reg_1"], "n_rep": [3, 2]})
+    serial = stv_by_regions(ballots, regions, max_workers=1)
+    parallel = stv_by_regions(ballots, regions, max_workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert serial.groupby("region").n_rep.sum().tolist() == [3, 2]
+    assert serial.votes.sum() == 40
+
+
+def test_read_ballots_chunks_are_merged(df_rankings, tmp_path):
+    data = pd.concat([df_rankings] * 50, ignore_index=True)
+    data["region"] = np.where(np.arange(len(data)) % 3 == 0, "reg_0", "reg_1")
+    path = tmp_path / "ballots.csv"
+    data.to_csv(path, index=False)
+
+    whole = read_ballots(path, chunksize=len(data))
+    chunked = read_ballots(path, chunksize=4)
+    for region, ballot_table in chunked.items():
+        expected = create_ballot_table(data[data.region == region].drop(columns="region"))
+        assert ballot_table.ballots.shape[0] == expected.ballots.shape[0]
+        assert ballot_table.weights.sum() == (data.region == region).sum()
+        assert (ballot_table.ballots == whole[region].ballots).all()
+        assert (ballot_table.weights == whole[region].weights).all()
@@ -0,0 +1,89 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from electoral_system_analysis.distribution_formulas import distributions_representative_matrix
+from electoral_system_analysis.vote_transfer import get_seat_costs, optimize_vote_transfer
+
+
+@pytest.fixture
+def votes() -> np.ndarray:
+    return np.array([[310, 205, 120, 40], [150, 260, 90, 70], [400, 100, 180, 25]], dtype=float)
+
+
+@pytest.mark.parametrize("formula_name", ["dhondt", "sainte_lague", "hare", "droop"])
+@pytest.mark.parametrize("source", [None, 0])
+def test_get_seat_costs_brute_force(votes, formula_name, source):
+    n_rep = np.array([5, 4, 6])
+    costs = get_seat_costs(formula_name, votes, n_rep, 2, source, 0.05)
+    current = distributions_representative_matrix(formula_name, votes, n_rep, 0.05)[:, 2]
+    for r in range(votes.shape[0]):
+        limit = int(votes[r, source]) if source is not None else 10000
+        extra = np.arange(limit + 1)
+        rows = np.repeat(votes[[r]], extra.size, axis=0)
+        rows[:, 2] += extra
+        if source is not None:
+            rows[:, source] -= extra
+        seats = distributions_representative_matrix(
+            formula_name, rows, np.full(extra.size, n_rep[r]), 0.05
+        )[:, 2]
+        for gain in range(1, n_rep[r] - current[r] + 1):
+            reached = np.flatnonzero(seats >= current[r] + gain)
+            expected = extra[reached[0]] if reached.size else np.inf
+            assert costs[r, gain] == expected
+
+
+@pytest.mark.parametrize("formula_name", ["hare", "droop", "hagenbach"])
+def test_get_seat_costs_population_paradox(formula_name):
+    # Con votos nuevos el partido puede ganar un escaño y volver a perderlo al crecer el
+    # cociente, así que los votos mínimos no se encuentran por bisección.
+    rng = np.random.default_rng(5)
+    votes = rng.integers(1, 300, (40, 4)).astype(float)
+    n_rep = rng.integers(2, 8, 40)
+    costs = get_seat_costs(formula_name, votes, n_rep, 1, None, 0.05, max_votes=3000)
+    current = distributions_representative_matrix(formula_name, votes, n_rep, 0.05)[:, 1]
+    extra = np.arange(3001)
+    n_paradox = 0
+    for r in range(votes.shape[0]):
+        rows = np.repeat(votes[[r]], extra.size, axis=0)
+        rows[:, 1] += extra
+        seats = distributions_representative_matrix(
+            formula_name, rows, np.full(extra.size, n_rep[r]), 0.05
+        )[:, 1]
+        for gain in range(1, n_rep[r] - current[r] + 1):
+            reached = seats >= current[r] + gain
+            expected = extra[reached][0] if reached.any() else np.inf
+            assert costs[r, gain] == expected
+            n_paradox += reached.any() and not reached[np.argmax(reached) :].all()
+    assert n_paradox > 0
+
+
+def test_optimize_vote_transfer(votes):
+    regions = pd.DataFrame({"reg_el_id": ["reg_0", "reg_1", "reg_2"], "n_rep": [5, 4, 6]})
+    df_votes = pd.DataFrame(
+        {
+            "region": np.repeat(regions.reg_el_id, 4),
+            "party": np.tile(["party_a", "party_b", "party_c", "party_d"], 3),
+            "votes": votes.reshape(-1),
+        }
+    )
+    result = optimize_vote_transfer("dhondt", df_votes, regions, "party_c", 300)
+    costs = result.costs.values
+    best = max(
+        sum(gains)
+        for gains in itertools.product(*[range(costs.shape[1])] * 3)
+        if costs[np.arange(3), gains].sum() <= 300
+    )
+    assert result.seats_gained == best
+    assert result.votes_used <= 300
+    assert result.df_regions.seats_gained.sum() == best
+
+    new_votes = votes.copy()
+    new_votes[:, 2] += result.df_regions.extra_votes.values
+    seats = distributions_representative_matrix("dhondt", new_votes, regions.n_rep.values)[:, 2]
+    assert (seats == result.df_regions.n_rep + result.df_regions.seats_gained).all()
+
+    moved = optimize_vote_transfer("dhondt", df_votes, regions, "party_c", 300, "party_a")
+    assert moved.seats_gained >= result.seats_gained